@@ -33,6 +33,8 @@ CREATE TABLE "user" (
 
 CREATE INDEX "user_roleId_idx" ON "user" ("roleId");
 CREATE INDEX "user_email_idx" ON "user" ("email");
+CREATE INDEX "user_createdAt_idx" ON "user" ("createdAt" DESC, "userId" DESC)
+    INCLUDE ("roleId");
 
 -- Таблица категорий
 CREATE TABLE "category" (
@@ -140,6 +142,8 @@ CREATE TABLE "order" (
 CREATE INDEX "order_userId_idx" ON "order" ("userId");
 CREATE INDEX "order_orderStatusId_idx" ON "order" ("orderStatusId");
 CREATE INDEX "order_addressId_idx" ON "order" ("addressId");
+CREATE INDEX "order_createdAt_idx" ON "order" ("createdAt" DESC, "orderId" DESC)
+    INCLUDE ("userId", "orderStatusId", "total", "paymentStatus");
 
 -- Таблица позиций заказа
 CREATE TABLE "orderItem" (
@@ -174,6 +178,8 @@ CREATE TABLE "review" (
 
 CREATE INDEX "review_productId_idx" ON "review" ("productId");
 CREATE INDEX "review_userId_idx" ON "review" ("userId");
+CREATE INDEX "review_createdAt_idx" ON "review" ("createdAt" DESC, "reviewId" DESC)
+    INCLUDE ("productId", "userId", "rating");
 
 -- Таблица списка желаний
 CREATE TABLE "wishlist" (
@@ -233,6 +239,8 @@ CREATE TABLE "auditLog" (
 );
 
 CREATE INDEX "auditLog_userId_idx" ON "auditLog" ("userId");
+CREATE INDEX "auditLog_createdAt_idx" ON "auditLog" ("createdAt" DESC, "auditLogId" DESC)
+    INCLUDE ("userId", "action", "tableName", "recordId");
 
 -- Таблица связи пользователь-группы (Django auth)
 CREATE TABLE "user_groups" (
@@ -361,27 +369,7 @@ ALTER TABLE "auditLog"
 
 -- ПРЕДСТАВЛЕНИЯ 
 
--- 1. Каталог товаров с категорией, брендом и средним рейтингом
-CREATE OR REPLACE VIEW v_product_catalog AS
-SELECT
-    p."productId",
-    p."productName",
-    p."price",
-    p."quantity" AS "stockQuantity",
-    p."ageRating",
-    c."categoryName",
-    b."brandName",
-    b."brandCountry",
-    COALESCE(ROUND(AVG(r."rating"), 2), 0) AS "avgRating",
-    COUNT(r."reviewId") AS "reviewCount"
-FROM "product" p
-    JOIN "category" c ON p."categoryId" = c."categoryId"
-    JOIN "brand" b ON p."brandId" = b."brandId"
-    LEFT JOIN "review" r ON p."productId" = r."productId"
-GROUP BY p."productId", p."productName", p."price", p."quantity",
-         p."ageRating", c."categoryName", b."brandName", b."brandCountry";
-
--- 2. Детали заказов — заказ, покупатель, статус, позиции
+-- 1. Детали заказов — заказ, покупатель, статус, позиции
 CREATE OR REPLACE VIEW v_order_details AS
 SELECT
     o."orderId",
@@ -404,8 +392,45 @@ FROM "order" o
     JOIN "orderItem" oi ON o."orderId" = oi."orderId"
     JOIN "product" p ON oi."productId" = p."productId";
 
+-- МАТЕРИАЛИЗОВАННЫЕ ПРЕДСТАВЛЕНИЯ
+-- Обновляются командой: python manage.py refresh_matviews
+
+-- 1. Статистика отзывов по товарам (сортировка/фильтрация отзывов в админ-панели)
+CREATE MATERIALIZED VIEW v_review_stats AS
+SELECT
+    r."productId",
+    COUNT(*) AS "reviewCount",
+    ROUND(AVG(r."rating"), 2) AS "avgRating",
+    MAX(r."createdAt") AS "lastReviewAt"
+FROM "review" r
+GROUP BY r."productId";
+
+-- Уникальный индекс нужен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX "v_review_stats_productId_idx" ON v_review_stats ("productId");
+
+-- 2. Каталог товаров с категорией, брендом и средним рейтингом
+CREATE MATERIALIZED VIEW v_product_catalog AS
+SELECT
+    p."productId",
+    p."productName",
+    p."price",
+    p."quantity" AS "stockQuantity",
+    p."ageRating",
+    c."categoryName",
+    b."brandName",
+    b."brandCountry",
+    COALESCE(ROUND(AVG(r."rating"), 2), 0) AS "avgRating",
+    COUNT(r."reviewId") AS "reviewCount"
+FROM "product" p
+    JOIN "category" c ON p."categoryId" = c."categoryId"
+    JOIN "brand" b ON p."brandId" = b."brandId"
+    LEFT JOIN "review" r ON p."productId" = r."productId"
+GROUP BY p."productId", p."productName", p."price", p."quantity",
+         p."ageRating", c."categoryName", b."brandName", b."brandCountry";
+CREATE UNIQUE INDEX "v_product_catalog_productId_idx" ON v_product_catalog ("productId");
+
 -- 3. Отчёт по продажам — выручка и количество заказов по месяцам
-CREATE OR REPLACE VIEW v_sales_report AS
+CREATE MATERIALIZED VIEW v_sales_report AS
 SELECT
     DATE_TRUNC('month', o."createdAt")::DATE AS "month",
     COUNT(DISTINCT o."orderId") AS "orderCount",
@@ -416,9 +441,10 @@ FROM "order" o
 WHERE os."orderStatusName" <> 'Отменен'
 GROUP BY DATE_TRUNC('month', o."createdAt")
 ORDER BY "month" DESC;
+CREATE UNIQUE INDEX "v_sales_report_month_idx" ON v_sales_report ("month");
 
 -- 4. Активность пользователей — заказы, отзывы, общая сумма
-CREATE OR REPLACE VIEW v_user_activity AS
+CREATE MATERIALIZED VIEW v_user_activity AS
 SELECT
     u."userId",
     u."firstName" || ' ' || u."lastName" AS "fullName",
@@ -434,9 +460,10 @@ FROM "user" u
     LEFT JOIN "review" rev ON u."userId" = rev."userId"
 GROUP BY u."userId", u."firstName", u."lastName", u."email",
          r."roleName", u."createdAt";
+CREATE UNIQUE INDEX "v_user_activity_userId_idx" ON v_user_activity ("userId");
 
 -- 5. Популярные товары — топ товаров по количеству продаж
-CREATE OR REPLACE VIEW v_popular_products AS
+CREATE MATERIALIZED VIEW v_popular_products AS
 SELECT
     p."productId",
     p."productName",
@@ -453,6 +480,7 @@ FROM "product" p
 WHERE os."orderStatusName" <> 'Отменен'
 GROUP BY p."productId", p."productName", c."categoryName"
 ORDER BY "totalSold" DESC;
+CREATE UNIQUE INDEX "v_popular_products_productId_idx" ON v_popular_products ("productId");
 
 -- ХРАНИМЫЕ ПРОЦЕДУРЫ 
 -- 1. Оформление заказа из корзины
@@ -1,14 +1,28 @@
 # Журнал аудита: запись действий администраторов и менеджеров в auditLog.
+import logging
+import threading
 from decimal import Decimal
 from django.utils import timezone
-from django.db import connection
+from django.db import connection, transaction
 from .models import AuditLog
 
+logger = logging.getLogger(__name__)
+
+# Состояние аудита текущего запроса (см. middleware.AuditLogMiddleware)
+_local = threading.local()
+
 # Устанавливаем ID текущего пользователя в сессии PostgreSQL.
+# В пределах запроса повторный SET для того же пользователя не выполняется.
+# SET внутри транзакции откатывается вместе с ней, поэтому запоминаем
+# пользователя только для SET в autocommit, а внутри транзакции сбрасываем кэш.
 def set_audit_user(user):
     if user and hasattr(user, 'pk') and user.pk:
+        if getattr(_local, 'audit_user_id', None) == user.pk:
+            return
         with connection.cursor() as cursor:
             cursor.execute("SET app.current_user_id = %s", [str(user.pk)])
+        if getattr(_local, 'buffer', None) is not None:
+            _local.audit_user_id = None if connection.in_atomic_block else user.pk
 
 SENSITIVE_FIELDS = frozenset({'password', 'password_hash'})
 
@@ -30,7 +44,8 @@ def _json_safe(val):
         return {k: _json_safe(v) for k, v in val.items()}
     return str(val)
 
-# Преобразуем экземпляр модели в словарь для лога
+# Преобразуем экземпляр модели в словарь для лога.
+# Для внешних ключей берём сохранённый id (attname), не загружая связанный объект.
 def model_to_log_dict(instance):
     if instance is None:
         return None
@@ -39,13 +54,48 @@ def model_to_log_dict(instance):
         if f.name in SENSITIVE_FIELDS:
             continue
         try:
-            val = getattr(instance, f.name)
+            val = getattr(instance, f.attname)
             data[f.name] = _json_safe(val)
         except Exception:
             pass
     return data
 
 
+# Значения полей из new_data (validated_data сериализатора) до сохранения.
+# Для внешних ключей — сохранённый id (attname).
+def snapshot_log_fields(instance, new_data):
+    snapshot = {}
+    for name in new_data:
+        if name in SENSITIVE_FIELDS:
+            continue
+        try:
+            field = instance._meta.get_field(name)
+        except Exception:
+            continue
+        snapshot[name] = getattr(instance, field.attname)
+    return snapshot
+
+
+# Только изменённые поля: пара словарей (старые значения, новые значения).
+# Новые значения берутся из уже сохранённого экземпляра, а не из new_data:
+# сериализатор может нормализовать данные при сохранении.
+def diff_log_dicts(snapshot, instance, new_data):
+    old_values = {}
+    new_values = {}
+    for name, value in new_data.items():
+        if name in SENSITIVE_FIELDS:
+            if value:
+                new_values[name] = '***'  # фиксируем факт смены, но не значение
+            continue
+        if name not in snapshot:
+            continue
+        current = getattr(instance, instance._meta.get_field(name).attname)
+        if snapshot[name] != current:
+            old_values[name] = _json_safe(snapshot[name])
+            new_values[name] = _json_safe(current)
+    return old_values, new_values
+
+
 def get_pk(instance):
     if instance is None:
         return None
@@ -58,7 +108,38 @@ def get_pk(instance):
             return int(getattr(instance, f.name, None))
     return None
 
+def start_audit_buffer():
+    _local.buffer = []
+    _local.audit_user_id = None
+
+
+# Сохраняем накопленные записи одним INSERT и отключаем буфер.
+# Если пачка не записалась (например, одна запись ссылается на удалённого
+# пользователя), сохраняем записи по одной, чтобы не потерять остальные.
+def flush_audit_buffer():
+    buffer = getattr(_local, 'buffer', None)
+    _local.buffer = None
+    _local.audit_user_id = None
+    if not buffer:
+        return
+    try:
+        with transaction.atomic():
+            AuditLog.objects.bulk_create(buffer, batch_size=100)
+        return
+    except Exception:
+        logger.exception("Не удалось записать аудит пачкой, сохраняем по одной записи")
+    for entry in buffer:
+        entry.pk = None
+        try:
+            with transaction.atomic():
+                entry.save()
+        except Exception:
+            # не ломаем основной запрос из-за ошибки аудита
+            logger.exception("Не удалось записать аудит: %s %s #%s",
+                             entry.action, entry.tableName, entry.recordId)
+
 # Записываем действие в auditLog.
+# Внутри запроса запись откладывается до конца запроса, иначе сохраняется сразу.
 def log_audit(user, action, table_name, record_id, old_values=None, new_values=None):
     try:
         if user is None:
@@ -68,7 +149,7 @@ def log_audit(user, action, table_name, record_id, old_values=None, new_values=N
             return
         if record_id is None:
             return
-        AuditLog.objects.create(
+        entry = AuditLog(
             userId_id=int(user_id),
             action=(action or '')[:100],
             tableName=(table_name or '')[:100],
@@ -77,5 +158,10 @@ def log_audit(user, action, table_name, record_id, old_values=None, new_values=N
             newValues=new_values,
             createdAt=timezone.now(),
         )
+        buffer = getattr(_local, 'buffer', None)
+        if buffer is not None:
+            buffer.append(entry)
+        else:
+            entry.save()
     except Exception:
         pass  # не ломаем основной запрос из-за ошибки аудита
@@ -0,0 +1,25 @@
+# Аутентификация по токену для API.
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication as BaseTokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+
+class TokenAuthentication(BaseTokenAuthentication):
+    """Токен-аутентификация, загружающая роль пользователя тем же запросом.
+
+    Проверки прав (get_role_name) обращаются к user.roleId на каждом запросе,
+    поэтому роль подтягиваем через select_related вместе с токеном.
+    Тексты ошибок совпадают с DRF, их переводит core.exceptions.
+    """
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user__roleId').get(key=key)
+        except model.DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
@@ -85,13 +85,15 @@ class Command(BaseCommand):
             result = subprocess.run(
                 cmd,
                 env=env,
-                capture_output=True,
+                # Дамп пишется в --file, stdout не нужен; stderr — для сообщения об ошибке
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
                 timeout=600,  # 10 минут
             )
             if result.returncode != 0:
                 raise CommandError(
-                    f'pg_dump завершился с ошибкой (код {result.returncode}):\n{result.stderr}'
+                    f'pg_dump завершился с ошибкой (код {result.returncode}):\n{result.stderr[-4000:]}'
                 )
         except FileNotFoundError:
             raise CommandError(
@@ -0,0 +1,42 @@
+# python manage.py refresh_matviews - Обновить все материализованные представления
+# python manage.py refresh_matviews --view v_review_stats - Обновить одно представление
+#
+# Представления обновляются после seed_db и при старте web-контейнера,
+# а в docker-compose каждые 5 минут — сервисом matviews. Без Docker
+# добавьте команду в cron, например:
+# */5 * * * * cd /app/joybox && python manage.py refresh_matviews
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Материализованные представления из create_database.sql
+MATERIALIZED_VIEWS = (
+    'v_review_stats',
+    'v_product_catalog',
+    'v_sales_report',
+    'v_user_activity',
+    'v_popular_products',
+)
+
+
+class Command(BaseCommand):
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--view',
+            type=str,
+            choices=MATERIALIZED_VIEWS,
+            default=None,
+            help='Обновить только указанное представление',
+        )
+
+    def handle(self, *args, **options):
+        views = (options['view'],) if options['view'] else MATERIALIZED_VIEWS
+        for view in views:
+            try:
+                # CONCURRENTLY не блокирует чтение представления на время обновления
+                with connection.cursor() as cursor:
+                    cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}')
+            except Exception as e:
+                raise CommandError(f'Не удалось обновить {view}: {e}')
+            self.stdout.write(self.style.SUCCESS(f'Обновлено: {view}'))
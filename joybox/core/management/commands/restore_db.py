@@ -103,14 +103,17 @@ class Command(BaseCommand):
             result = subprocess.run(
                 cmd,
                 env=env,
-                capture_output=True,
+                # Вывод утилиты не нужен (psql печатает строку на каждую
+                # команду дампа), сохраняем только stderr для сообщения об ошибке
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
                 timeout=600,
             )
             # pg_restore может вернуть предупреждения (код 1) при --clean --if-exists
             if result.returncode not in (0, 1) and ext == '.backup':
                 raise CommandError(
-                    f'{tool} завершился с ошибкой (код {result.returncode}):\n{result.stderr}'
+                    f'{tool} завершился с ошибкой (код {result.returncode}):\n{result.stderr[-4000:]}'
                 )
             if result.returncode != 0 and ext == '.sql':
                 # psql: предупреждения допустимы
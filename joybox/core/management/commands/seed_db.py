@@ -4,6 +4,7 @@
 from datetime import date
 from pathlib import Path
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import connection
 from django.utils import timezone
@@ -53,6 +54,10 @@ class Command(BaseCommand):
         # Создаём отзывы
         self._create_reviews(created_users)
 
+        # Материализованные представления созданы на пустых таблицах —
+        # пересчитываем их по загруженным данным
+        call_command('refresh_matviews', stdout=self.stdout)
+
         self.stdout.write(self.style.SUCCESS('Начальные данные успешно загружены!'))
 
     def _clean(self):
@@ -0,0 +1,16 @@
+# Middleware проекта.
+from .audit import start_audit_buffer, flush_audit_buffer
+
+
+# Накапливает записи аудита за время запроса и сохраняет их одним
+# bulk_create после формирования ответа.
+class AuditLogMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start_audit_buffer()
+        try:
+            return self.get_response(request)
+        finally:
+            flush_audit_buffer()
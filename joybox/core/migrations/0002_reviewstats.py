@@ -0,0 +1,27 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewStats',
+            fields=[
+                ('productId', models.OneToOneField(db_column='productId', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='reviewStats', serialize=False, to='core.product', verbose_name='Продукт')),
+                ('reviewCount', models.IntegerField(verbose_name='Количество отзывов')),
+                ('avgRating', models.DecimalField(decimal_places=2, max_digits=3, verbose_name='Средний рейтинг')),
+                ('lastReviewAt', models.DateTimeField(verbose_name='Дата последнего отзыва')),
+            ],
+            options={
+                'verbose_name': 'Статистика отзывов',
+                'verbose_name_plural': 'Статистика отзывов',
+                'db_table': 'v_review_stats',
+                'managed': False,
+            },
+        ),
+    ]
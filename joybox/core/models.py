@@ -265,6 +265,22 @@ class Review(models.Model):
     def __str__(self):
         return f"Review {self.reviewId} for {self.productId}"
 
+# Материализованное представление v_review_stats (обновляется refresh_matviews)
+class ReviewStats(models.Model):
+    productId = models.OneToOneField(Product, on_delete=models.DO_NOTHING, primary_key=True, db_column='productId', related_name='reviewStats', verbose_name='Продукт')
+    reviewCount = models.IntegerField(verbose_name='Количество отзывов')
+    avgRating = models.DecimalField(max_digits=3, decimal_places=2, verbose_name='Средний рейтинг')
+    lastReviewAt = models.DateTimeField(verbose_name='Дата последнего отзыва')
+
+    class Meta:
+        managed = False
+        db_table = 'v_review_stats'
+        verbose_name = 'Статистика отзывов'
+        verbose_name_plural = 'Статистика отзывов'
+
+    def __str__(self):
+        return f"Review stats for {self.productId_id}"
+
 class Wishlist(models.Model):
     wishlistId = models.BigAutoField(primary_key=True)
     userId = models.ForeignKey(User, on_delete=models.CASCADE, db_column='userId', verbose_name='Пользователь')
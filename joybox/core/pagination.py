@@ -0,0 +1,17 @@
+# Курсорная пагинация для списков админ-панели.
+from rest_framework.pagination import CursorPagination
+
+
+# Пагинация включается только при явном ?page_size=N: без параметра список
+# отдаётся целиком, как раньше. Курсор строится по индексируемому полю,
+# поэтому страницы не требуют COUNT(*) и OFFSET по всей таблице.
+class AdminCursorPagination(CursorPagination):
+    ordering = ('-createdAt',)
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+# У товаров нет даты создания — курсор по первичному ключу
+class ProductCursorPagination(AdminCursorPagination):
+    ordering = ('-productId',)
@@ -0,0 +1,32 @@
+# Ролевые права доступа к API (DRF permission-классы).
+from rest_framework.permissions import BasePermission
+
+ROLE_ADMIN = 'Администратор'
+ROLE_MANAGER = 'Менеджер'
+ROLE_BUYER = 'Покупатель'
+
+ADMIN_MANAGER_ROLES = frozenset((ROLE_ADMIN, ROLE_MANAGER))
+
+
+# Название роли пользователя (None для анонимного или пользователя без роли)
+def get_role_name(user):
+    if not user or not user.is_authenticated:
+        return None
+    role = getattr(user, 'roleId', None)
+    return role.roleName if role else None
+
+
+class IsAdminOrManager(BasePermission):
+    """Доступ для администраторов и менеджеров."""
+    message = 'Доступ запрещён.'
+
+    def has_permission(self, request, view):
+        return get_role_name(request.user) in ADMIN_MANAGER_ROLES
+
+
+class IsAdmin(BasePermission):
+    """Доступ только для администраторов."""
+    message = 'Доступ запрещён.'
+
+    def has_permission(self, request, view):
+        return get_role_name(request.user) == ROLE_ADMIN
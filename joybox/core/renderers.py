@@ -0,0 +1,34 @@
+# JSON-рендерер API на orjson (если установлен).
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False  # используем стандартный JSONRenderer DRF
+
+_drf_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer, сериализующий ответы через orjson.
+
+    Типы, которые orjson не знает (Decimal, ленивые строки, QuerySet), и даты
+    передаются кодировщику DRF, поэтому формат ответа не меняется.
+    Запросы с отступами (?indent / Accept: ...; indent=N) и окружение
+    без orjson обслуживает родительский класс.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not ORJSON_AVAILABLE:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=_drf_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
@@ -250,10 +250,16 @@ class ReviewUpdateSerializer(serializers.Serializer):
 class AdminReviewSerializer(serializers.ModelSerializer):
     user = UserSerializer(source='userId', read_only=True)
     productName = serializers.CharField(source='productId.productName', read_only=True)
+    # Аннотации из v_review_stats (см. views._with_review_stats)
+    productReviewCount = serializers.IntegerField(read_only=True, default=None)
+    productAvgRating = serializers.FloatField(read_only=True, default=None)
     
     class Meta:
         model = Review
-        fields = ['reviewId', 'productId', 'productName', 'userId', 'user', 'rating', 'reviewText', 'createdAt', 'updatedAt']
+        fields = [
+            'reviewId', 'productId', 'productName', 'userId', 'user', 'rating', 'reviewText',
+            'createdAt', 'updatedAt', 'productReviewCount', 'productAvgRating',
+        ]
 
 class WishlistSerializer(serializers.ModelSerializer):
     product = ProductListSerializer(source='productId', read_only=True)
@@ -0,0 +1,81 @@
+# Фоновые задачи Celery: создание и восстановление резервных копий БД.
+from io import StringIO
+from pathlib import Path
+
+from celery import shared_task
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from .audit import log_audit
+from .models import User
+
+# Сколько символов вывода команды держим в памяти и сколько пишем в аудит
+OUTPUT_LIMIT = 64 * 1024
+AUDIT_OUTPUT_LIMIT = 4 * 1024
+
+# Каталог файлов фоновой выгрузки таблиц и срок их хранения
+EXPORT_DIR = Path(settings.BACKUP_DIR).resolve() / 'exports'
+EXPORT_KEEP_SECONDS = 24 * 60 * 60
+
+
+class BoundedIO(StringIO):
+    """Буфер вывода management-команды: всё сверх limit отбрасывается."""
+
+    def __init__(self, limit=OUTPUT_LIMIT):
+        super().__init__()
+        self.limit = limit
+
+    def write(self, s):
+        room = self.limit - self.tell()
+        if room > 0:
+            super().write(s[:room])
+        return len(s)
+
+
+# Создание бэкапа командой backup_db; результат — вывод команды
+@shared_task
+def create_backup_task(user_id, fmt, data_only):
+    out = BoundedIO()
+    call_command('backup_db', format=fmt, data_only=data_only, stdout=out)
+    output = out.getvalue().strip()
+    log_audit(User.objects.filter(pk=user_id).first(), 'CREATE', 'backup', 0,
+              old_values=None,
+              new_values={'format': fmt, 'data_only': data_only,
+                          'output': output[-AUDIT_OUTPUT_LIMIT:]})
+    return {'output': output}
+
+
+# Восстановление БД командой restore_db из файла filepath
+@shared_task
+def restore_backup_task(user_id, filepath):
+    out = BoundedIO()
+    err = BoundedIO()
+    call_command('restore_db', filepath, no_confirm=True, stdout=out, stderr=err)
+    # Пользователь ищется после восстановления: таблица users уже из бэкапа
+    filename = Path(filepath).name
+    log_audit(User.objects.filter(pk=user_id).first(), 'UPDATE', 'backup_restore', 0,
+              old_values=None,
+              new_values={'filename': filename})
+    return {'filename': filename}
+
+
+# Выгрузка таблицы в файл EXPORT_DIR; результат — имя файла.
+# Идентификатор задачи в имени не даёт двум выгрузкам одной таблицы
+# в ту же секунду писать в один файл
+@shared_task(bind=True)
+def export_table_task(self, table, fmt):
+    from .views import AdminDataExportView  # views импортирует этот модуль
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    # Заодно удаляем выгрузки старше суток
+    expired = timezone.now().timestamp() - EXPORT_KEEP_SECONDS
+    for old in EXPORT_DIR.iterdir():
+        if old.is_file() and old.stat().st_mtime < expired:
+            old.unlink(missing_ok=True)
+
+    ext = 'sql' if fmt == 'sql' else 'csv'
+    filename = f'{table}_{timezone.localtime():%Y%m%d_%H%M%S}_{self.request.id}.{ext}'
+    with open(EXPORT_DIR / filename, 'wb') as fileobj:
+        AdminDataExportView().write_export(table, fmt, fileobj)
+    return {'filename': filename}
@@ -4,6 +4,8 @@ from django.test import TestCase, TransactionTestCase
 from rest_framework.test import APIClient
 from rest_framework.authtoken.models import Token
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from django.core.cache import cache
 from django.db import connection
 from django.utils import timezone
 from decimal import Decimal
@@ -11,6 +13,12 @@ from datetime import date, timedelta
 import csv
 import io
 import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from celery import states
+from celery.result import EagerResult
 
 from .models import (
     Role, User, Category, Brand, Product, ProductImage, ProductAttribute,
@@ -18,6 +26,11 @@ from .models import (
     ParentChild
 )
 
+from .authentication import TokenAuthentication
+from .renderers import ORJSONRenderer
+from .permissions import get_role_name
+from .views import AdminDataExportView, EXPORT_TABLE_CONFIG
+
 import uuid as _uuid
 
 
@@ -173,6 +186,25 @@ class CategoryCRUDTest(TestCase, BaseTestMixin):
         cat.refresh_from_db()
         self.assertEqual(cat.categoryName, 'Новое название')
 
+    def test_admin_update_category_audit_values(self):
+        """Аудит обновления категории содержит старые и новые значения."""
+        cat = self.create_category('До изменения')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token.key}')
+        response = self.client.patch(
+            f'/api/admin/categories/{cat.categoryId}/',
+            {'categoryName': 'После изменения'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        log = AuditLog.objects.filter(
+            tableName='category', action='UPDATE', recordId=cat.categoryId
+        ).first()
+        self.assertIsNotNone(log)
+        self.assertEqual(log.oldValues['categoryName'], 'До изменения')
+        self.assertEqual(log.newValues['categoryName'], 'После изменения')
+        # В журнал попадают только изменённые поля
+        self.assertNotIn('categoryDescription', log.newValues)
+
     def test_admin_delete_category(self):
         """Администратор удаляет категорию."""
         cat = self.create_category('Для удаления')
@@ -299,6 +331,27 @@ class ProductCRUDTest(TestCase, BaseTestMixin):
         response = self.client.delete(f'/api/admin/products/{product.productId}/')
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+    def test_upload_rejects_non_image_content(self):
+        """Файл с Content-Type image/*, но не являющийся изображением, отклоняется."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        fake = SimpleUploadedFile('photo.png', b'<script>alert(1)</script>', content_type='image/png')
+        response = self.client.post('/api/admin/upload-image/', {'file': fake}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_add_product_attribute(self):
+        """Администратор добавляет характеристику товара."""
+        product = self.create_product(self.category, self.brand, 'С характеристикой')
+        response = self.client.post(
+            f'/api/admin/products/{product.productId}/attributes/',
+            {'productAttributeName': 'Материал', 'productAttributeValue': 'Пластик'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['productId'], product.productId)
+        log = AuditLog.objects.filter(tableName='productAttribute', action='CREATE').first()
+        self.assertIsNotNone(log)
+        self.assertEqual(log.newValues['productId'], product.productId)
+
     def test_product_detail(self):
         """Получение детальной информации о товаре."""
         product = self.create_product(self.category, self.brand, 'Детали')
@@ -318,6 +371,18 @@ class UserCRUDTest(TestCase, BaseTestMixin):
     def setUp(self):
         self.client = APIClient()
 
+    def test_parent_unlinks_child(self):
+        """Родитель отвязывает ребёнка; повторное удаление — 404."""
+        parent, parent_token = self.create_user(self.roles, 'Покупатель')
+        child, _ = self.create_user(self.roles, 'Ребенок')
+        ParentChild.objects.create(userId=parent, childId=child)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {parent_token.key}')
+        response = self.client.delete(f'/api/auth/children/{child.userId}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ParentChild.objects.filter(userId=parent, childId=child).exists())
+        response = self.client.delete(f'/api/auth/children/{child.userId}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_user_registration(self):
         """Регистрация нового пользователя."""
         email = f'ivan_reg_{_uid()}@test.com'
@@ -425,6 +490,19 @@ class UserCRUDTest(TestCase, BaseTestMixin):
         response = self.client.delete(f'/api/admin/users/{victim.userId}/')
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+    def test_admin_update_user_audit_saved_values(self):
+        """Аудит изменения пользователя пишет сохранённое значение, а не присланное."""
+        admin, admin_token = self.create_user(self.roles, 'Администратор')
+        victim, _ = self.create_user(self.roles)
+        User.objects.filter(pk=victim.pk).update(username='old_login')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {admin_token.key}')
+        response = self.client.patch(f'/api/admin/users/{victim.userId}/', {'username': ''}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        log = AuditLog.objects.filter(tableName='user', action='UPDATE', recordId=victim.userId).first()
+        self.assertIsNotNone(log)
+        self.assertEqual(log.oldValues['username'], 'old_login')
+        self.assertEqual(log.newValues['username'], victim.email)
+
 # 2. ПОИСК, СОРТИРОВКА, ФИЛЬТРЫ
 
 class ProductFilterTest(TestCase, BaseTestMixin):
@@ -519,6 +597,32 @@ class RolePermissionTest(TestCase, BaseTestMixin):
         response = self.client.get('/api/admin/panel/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_admin_users_list_unpaginated_by_default(self):
+        """Без page_size список пользователей отдаётся целиком."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token.key}')
+        response = self.client.get('/api/admin/users/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(len(response.data), 4)
+
+    def test_admin_users_cursor_pagination(self):
+        """С page_size список пользователей разбивается курсором."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token.key}')
+        response = self.client.get('/api/admin/users/?page_size=2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        next_page = self.client.get(response.data['next'])
+        self.assertEqual(next_page.status_code, status.HTTP_200_OK)
+        first_ids = {u['userId'] for u in response.data['results']}
+        next_ids = {u['userId'] for u in next_page.data['results']}
+        self.assertFalse(first_ids & next_ids)
+
+    def test_token_auth_loads_role(self):
+        """Роль загружается вместе с токеном, проверка прав не делает запросов."""
+        user, _ = TokenAuthentication().authenticate_credentials(self.manager_token.key)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role_name(user), 'Менеджер')
+
     def test_buyer_no_admin_panel(self):
         """Покупатель НЕ имеет доступа к панели."""
         self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.buyer_token.key}')
@@ -532,11 +636,10 @@ class RolePermissionTest(TestCase, BaseTestMixin):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_manager_no_audit_logs(self):
-        """Менеджер НЕ видит журнал аудита (пустой queryset)."""
+        """Менеджер НЕ видит журнал аудита."""
         self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.manager_token.key}')
         response = self.client.get('/api/admin/audit-logs/')
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
     def test_unauthenticated_no_admin(self):
         """Неавторизованный пользователь не имеет доступа к админке."""
@@ -562,12 +665,22 @@ class RolePermissionTest(TestCase, BaseTestMixin):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_buyer_cannot_manage_users(self):
-        """Покупатель не видит пользователей (пустой список)."""
+        """Покупатель не видит пользователей."""
         self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.buyer_token.key}')
         response = self.client.get('/api/admin/users/')
-        # Вьюха возвращает 200 с пустым queryset для не-администраторов
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_manager_cannot_manage_users(self):
+        """Менеджер не имеет доступа к управлению пользователями."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.manager_token.key}')
+        response = self.client.get('/api/admin/users/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_buyer_no_admin_products(self):
+        """Покупатель не видит список товаров админки."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.buyer_token.key}')
+        response = self.client.get('/api/admin/products/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
     def test_admin_cannot_delete_self(self):
         """Администратор не может удалить свой аккаунт."""
@@ -639,6 +752,42 @@ class CartAndOrderTest(TransactionTestCase, BaseTestMixin):
         response = self.client.get('/api/auth/orders/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def _create_order(self, payment_type):
+        address = Address.objects.create(
+            userId=self.buyer, city='Москва', street='Тверская', house='1', index='123456'
+        )
+        return Order.objects.create(
+            userId=self.buyer, orderStatusId=self.statuses['Новый'], total=Decimal('500.00'),
+            addressId=address, deliveryType=Order.DELIVERY_COURIER, paymentType=payment_type,
+            paymentStatus=Order.PAYMENT_STATUS_PENDING, createdAt=timezone.now(),
+        )
+
+    def test_manager_mark_order_paid(self):
+        """Менеджер отмечает оплату при получении; повторная отметка отклоняется."""
+        _, manager_token = self.create_user(self.roles, 'Менеджер')
+        order = self._create_order(Order.PAYMENT_CASH)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {manager_token.key}')
+        response = client.post(f'/api/admin/orders/{order.orderId}/mark-paid/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        order.refresh_from_db()
+        self.assertEqual(order.paymentStatus, Order.PAYMENT_STATUS_PAID)
+        response = client.post(f'/api/admin/orders/{order.orderId}/mark-paid/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_mark_paid_rejects_online_and_missing_orders(self):
+        """Онлайн-заказ нельзя отметить оплаченным, несуществующий — 404."""
+        _, manager_token = self.create_user(self.roles, 'Менеджер')
+        order = self._create_order(Order.PAYMENT_ONLINE)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {manager_token.key}')
+        response = client.post(f'/api/admin/orders/{order.orderId}/mark-paid/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        order.refresh_from_db()
+        self.assertEqual(order.paymentStatus, Order.PAYMENT_STATUS_PENDING)
+        response = client.post(f'/api/admin/orders/{order.orderId + 1000}/mark-paid/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class ReviewTest(TestCase, BaseTestMixin):
     """Тесты отзывов."""
@@ -674,6 +823,56 @@ class ReviewTest(TestCase, BaseTestMixin):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data), 1)
 
+    def test_admin_reviews_with_product_stats(self):
+        """Админ-список отзывов содержит статистику товара из v_review_stats."""
+        Review.objects.create(
+            productId=self.product, userId=self.buyer,
+            rating=5, reviewText='Отлично',
+            createdAt=timezone.now(), updatedAt=timezone.now()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('REFRESH MATERIALIZED VIEW v_review_stats')
+        _, manager_token = self.create_user(self.roles, 'Менеджер')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {manager_token.key}')
+        response = client.get('/api/admin/reviews/?ordering=-productAvgRating')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['productReviewCount'], 1)
+        self.assertEqual(response.data[0]['productAvgRating'], 5.0)
+
+    def test_admin_reviews_min_avg_rating_not_finite(self):
+        """Нечисловой min_avg_rating (NaN, Infinity) игнорируется, а не даёт 500."""
+        Review.objects.create(
+            productId=self.product, userId=self.buyer,
+            rating=4, reviewText='Хорошо',
+            createdAt=timezone.now(), updatedAt=timezone.now()
+        )
+        _, manager_token = self.create_user(self.roles, 'Менеджер')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {manager_token.key}')
+        for value in ('NaN', 'Infinity', 'abc'):
+            response = client.get(f'/api/admin/reviews/?min_avg_rating={value}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data), 1)
+
+    def test_admin_reviews_cursor_by_stats_without_matview_row(self):
+        """Курсор по статистике работает для отзывов, ещё не попавших в v_review_stats."""
+        for rating in (3, 4):
+            Review.objects.create(
+                productId=self.product, userId=self.buyer,
+                rating=rating, reviewText='Без статистики',
+                createdAt=timezone.now(), updatedAt=timezone.now()
+            )
+        _, manager_token = self.create_user(self.roles, 'Менеджер')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {manager_token.key}')
+        response = client.get('/api/admin/reviews/?ordering=productAvgRating&page_size=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['productAvgRating'], 0.0)
+        response = client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
 
 class WishlistTest(TestCase, BaseTestMixin):
     """Тесты списка желаний."""
@@ -848,6 +1047,18 @@ class AuditTriggerTest(TransactionTestCase, BaseTestMixin):
             self.assertIsNotNone(log.oldValues)
             self.assertIsNotNone(log.newValues)
 
+    def test_audit_buffer_flushed_in_bulk(self):
+        """Записи аудита внутри буфера сохраняются только при сбросе."""
+        from .audit import start_audit_buffer, flush_audit_buffer, log_audit
+        start_audit_buffer()
+        try:
+            log_audit(self.admin, 'UPDATE', 'category', 1, old_values={}, new_values={})
+            log_audit(self.admin, 'UPDATE', 'brand', 2, old_values={}, new_values={})
+            self.assertEqual(AuditLog.objects.filter(userId=self.admin).count(), 0)
+        finally:
+            flush_audit_buffer()
+        self.assertEqual(AuditLog.objects.filter(userId=self.admin).count(), 2)
+
 # 6. ТРАНЗАКЦИИ
 
 class TransactionTest(TransactionTestCase, BaseTestMixin):
@@ -990,6 +1201,7 @@ class AdminManagementFlowTest(TransactionTestCase, BaseTestMixin):
 
     def setUp(self):
         _truncate_app_tables()
+        cache.clear()
 
     def test_admin_management_flow(self):
         """Создание категории → бренда → товара → просмотр аналитики."""
@@ -1036,10 +1248,28 @@ class AdminManagementFlowTest(TransactionTestCase, BaseTestMixin):
         # 5. Просмотр аналитики продаж
         sales_resp = client.get('/api/admin/analytics/sales/')
         self.assertEqual(sales_resp.status_code, status.HTTP_200_OK)
+        self.assertIn('orders_by_status', sales_resp.data)
+        self.assertIn('orders_by_payment', sales_resp.data)
+        today = timezone.localdate().isoformat()
+        sales_resp = client.get(f'/api/admin/analytics/sales/?date_from={today}&date_to={today}')
+        self.assertEqual(sales_resp.status_code, status.HTTP_200_OK)
+        export_resp = client.get('/api/admin/analytics/sales/?export=csv')
+        self.assertEqual(export_resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(export_resp.streaming)
+        export_text = b''.join(export_resp.streaming_content).decode('utf-8-sig')
+        self.assertIn('ИТОГО', export_text)
+        # Повторная выгрузка за тот же период отдаётся из кэша
+        cached_resp = client.get('/api/admin/analytics/sales/?export=csv')
+        self.assertFalse(cached_resp.streaming)
+        self.assertEqual(cached_resp.content.decode('utf-8-sig'), export_text)
 
         # 6. Просмотр аналитики товаров
         products_resp = client.get('/api/admin/analytics/products/')
         self.assertEqual(products_resp.status_code, status.HTTP_200_OK)
+        export_resp = client.get('/api/admin/analytics/products/?export=csv')
+        self.assertEqual(export_resp.status_code, status.HTTP_200_OK)
+        header = b''.join(export_resp.streaming_content).decode('utf-8-sig').splitlines()[0]
+        self.assertTrue(header.startswith('Товар,Категория,Бренд'))
 
         # 7. Просмотр активности пользователей
         activity_resp = client.get('/api/admin/analytics/user-activity/')
@@ -1069,25 +1299,43 @@ class DataExportTest(TestCase, BaseTestMixin):
         response = self.client.get('/api/admin/data-export/?table=product&file_format=csv')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('text/csv', response['Content-Type'])
-        content = response.content.decode('utf-8-sig')
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
         reader = csv.reader(io.StringIO(content))
         rows = list(reader)
         self.assertGreater(len(rows), 1)  # заголовок + данные
         self.assertIn('productId', rows[0])
+        self.assertIn('categoryId', rows[0])
+        names = {row[rows[0].index('productName')] for row in rows[1:]}
+        self.assertIn('Экспорт-товар-1', names)
 
     def test_export_products_sql(self):
         """Экспорт товаров в SQL."""
         response = self.client.get('/api/admin/data-export/?table=product&file_format=sql')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        content = response.content.decode('utf-8')
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
         self.assertIn('INSERT INTO', content)
         self.assertIn('product', content)
+        self.assertIn('-- Записей: 2', content)
+
+    def test_export_copy_matches_python_csv(self):
+        """CSV через COPY совпадает с построчной выгрузкой, включая даты и NULL."""
+        config = EXPORT_TABLE_CONFIG['user']
+        response = self.client.get('/api/admin/data-export/?table=user&file_format=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], config['headers'])
+        expected = list(AdminDataExportView._csv_rows(config['model'], config['fields']))
+        self.assertEqual(rows[1:], expected)
+        created_at = rows[1][config['headers'].index('createdAt')]
+        self.assertTrue(created_at.endswith('+00:00'))
 
     def test_export_categories_csv(self):
         """Экспорт категорий в CSV."""
         response = self.client.get('/api/admin/data-export/?table=category&file_format=csv')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        content = response.content.decode('utf-8-sig')
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
         self.assertIn('categoryId', content)
 
     def test_export_brands_csv(self):
@@ -1115,6 +1363,58 @@ class DataExportTest(TestCase, BaseTestMixin):
         response = client.get('/api/admin/data-export/?table=product&file_format=csv')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_export_large_table_queued(self):
+        """Большая таблица при работающем воркере выгружается в фоне — 202."""
+        pending = EagerResult('export-task-1', None, states.PENDING)
+        with mock.patch('core.views.celery_app') as app, \
+                mock.patch('core.views.EXPORT_ASYNC_MIN_ROWS', 1), \
+                mock.patch('core.views.export_table_task.delay', return_value=pending) as delay:
+            app.conf.task_always_eager = False
+            response = self.client.get('/api/admin/data-export/?table=product&file_format=csv')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['task_id'], 'export-task-1')
+        delay.assert_called_once_with('product', 'csv')
+
+    def test_export_job_pending(self):
+        """Незавершённая выгрузка — 202 со статусом задачи."""
+        pending = EagerResult('export-task-1', None, states.STARTED)
+        with mock.patch('core.views.AsyncResult', return_value=pending):
+            response = self.client.get('/api/admin/data-export/jobs/export-task-1/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], states.STARTED)
+
+    def test_export_job_failed(self):
+        """Упавшая выгрузка — ошибка 500."""
+        failed = EagerResult('export-task-1', RuntimeError('disk full'), states.FAILURE)
+        with mock.patch('core.views.AsyncResult', return_value=failed):
+            response = self.client.get('/api/admin/data-export/jobs/export-task-1/')
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertIn('disk full', response.data['detail'])
+
+    def test_export_job_foreign_task(self):
+        """Идентификатор задачи бэкапа вместо выгрузки — 404, а не 500."""
+        done = EagerResult('backup-task-1', {'output': 'ok'}, states.SUCCESS)
+        with mock.patch('core.views.AsyncResult', return_value=done):
+            response = self.client.get('/api/admin/data-export/jobs/backup-task-1/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_job_done(self):
+        """Готовая выгрузка отдаётся файлом; удалённый файл — 404."""
+        with tempfile.TemporaryDirectory() as export_dir:
+            export_dir = Path(export_dir)
+            (export_dir / 'product_export-task-1.csv').write_bytes(b'productId\r\n1\r\n')
+            done = EagerResult('export-task-1', {'filename': 'product_export-task-1.csv'}, states.SUCCESS)
+            with mock.patch('core.views.AsyncResult', return_value=done), \
+                    mock.patch('core.views.EXPORT_DIR', export_dir):
+                response = self.client.get('/api/admin/data-export/jobs/export-task-1/')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(b''.join(response.streaming_content), b'productId\r\n1\r\n')
+                response.close()
+
+                (export_dir / 'product_export-task-1.csv').unlink()
+                response = self.client.get('/api/admin/data-export/jobs/export-task-1/')
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class DataImportTest(TransactionTestCase, BaseTestMixin):
     """Тесты импорта данных из CSV."""
@@ -1155,6 +1455,22 @@ class DataImportTest(TransactionTestCase, BaseTestMixin):
         self.assertIn('Создано записей: 2', response.data['detail'])
         self.assertTrue(Category.objects.filter(categoryName='Импортированная-1').exists())
 
+    def test_import_too_large(self):
+        """Файл больше MAX_IMPORT_BYTES — ошибка 413, записи не создаются."""
+        csv_file = self._make_csv(
+            ['categoryName', 'categoryDescription'],
+            [['Слишком-большой', 'Описание']]
+        )
+        csv_file.name = 'categories.csv'
+        with mock.patch('core.views.MAX_IMPORT_BYTES', 10):
+            response = self.client.post(
+                '/api/admin/data-import/',
+                {'table': 'category', 'file': csv_file},
+                format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(Category.objects.filter(categoryName='Слишком-большой').exists())
+
     def test_import_brands(self):
         """Импорт брендов из CSV."""
         csv_file = self._make_csv(
@@ -1170,6 +1486,33 @@ class DataImportTest(TransactionTestCase, BaseTestMixin):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(Brand.objects.filter(brandName='CSV-бренд').exists())
 
+    def test_import_products_reports_bad_rows(self):
+        """Некорректные строки не мешают импорту остальных и указываются в ошибках."""
+        cat = self.create_category()
+        brand = self.create_brand()
+        headers = ['productName', 'productDescription', 'categoryId', 'brandId',
+                   'price', 'ageRating', 'quantity', 'weightKg', 'dimensions']
+        csv_file = self._make_csv(headers, [
+            ['CSV-товар-1', 'Описание', cat.pk, brand.pk, '100.00', 3, 5, '0.50', '10x10x10'],
+            ['CSV-товар-2', 'Описание', cat.pk, brand.pk, 'abc', 3, 5, '0.50', '10x10x10'],
+            ['CSV-товар-3', 'Описание', cat.pk, 999999, '100.00', 3, 5, '0.50', '10x10x10'],
+            ['CSV-товар-4', 'Описание', cat.pk, brand.pk, '200.00', 3, 5, '0.50', '10x10x10'],
+        ])
+        csv_file.name = 'products.csv'
+        response = self.client.post(
+            '/api/admin/data-import/',
+            {'table': 'product', 'file': csv_file},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Создано записей: 2', response.data['detail'])
+        self.assertIn('Строка 3', response.data['detail'])
+        self.assertIn('Строка 4', response.data['detail'])
+        self.assertEqual(
+            set(Product.objects.values_list('productName', flat=True)),
+            {'CSV-товар-1', 'CSV-товар-4'}
+        )
+
     def test_import_missing_required_fields(self):
         """Импорт с отсутствующими обязательными полями — ошибка."""
         csv_file = self._make_csv(
@@ -1204,6 +1547,61 @@ class DataImportTest(TransactionTestCase, BaseTestMixin):
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+
+class BackupTaskTest(TestCase, BaseTestMixin):
+    """Тесты фоновых задач резервного копирования."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.roles = cls.create_roles()
+        cls.admin, cls.admin_token = cls.create_user(cls.roles, 'Администратор')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token.key}')
+
+    def test_create_backup_queued(self):
+        """Задача ещё не выполнена — 202 с идентификатором задачи."""
+        pending = EagerResult('backup-task-1', None, states.PENDING)
+        with mock.patch('core.views.create_backup_task.delay', return_value=pending) as delay:
+            response = self.client.post('/api/admin/backups/', {'format': 'sql'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['task_id'], 'backup-task-1')
+        delay.assert_called_once_with(self.admin.pk, 'sql', False)
+
+    def test_backup_task_pending(self):
+        """Статус незавершённой задачи без результата."""
+        pending = EagerResult('backup-task-1', None, states.PENDING)
+        with mock.patch('core.views.AsyncResult', return_value=pending):
+            response = self.client.get('/api/admin/backups/task/backup-task-1/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], states.PENDING)
+        self.assertNotIn('result', response.data)
+
+    def test_backup_task_success(self):
+        """Успешная задача отдаёт свой результат."""
+        done = EagerResult('backup-task-1', {'output': 'ok'}, states.SUCCESS)
+        with mock.patch('core.views.AsyncResult', return_value=done):
+            response = self.client.get('/api/admin/backups/task/backup-task-1/')
+        self.assertEqual(response.data['status'], states.SUCCESS)
+        self.assertEqual(response.data['result'], {'output': 'ok'})
+
+    def test_backup_task_failure(self):
+        """Упавшая задача отдаёт текст ошибки."""
+        failed = EagerResult('backup-task-1', RuntimeError('pg_dump failed'), states.FAILURE)
+        with mock.patch('core.views.AsyncResult', return_value=failed):
+            response = self.client.get('/api/admin/backups/task/backup-task-1/')
+        self.assertEqual(response.data['status'], states.FAILURE)
+        self.assertEqual(response.data['detail'], 'pg_dump failed')
+
+    def test_backup_task_forbidden_for_buyer(self):
+        """Статус задачи доступен только администратору."""
+        _, buyer_token = self.create_user(self.roles, 'Покупатель')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {buyer_token.key}')
+        response = client.get('/api/admin/backups/task/backup-task-1/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
 # 9. АДРЕСНАЯ КНИГА
 
 class AddressTest(TestCase, BaseTestMixin):
@@ -1293,3 +1691,15 @@ class ErrorHandlingTest(TestCase, BaseTestMixin):
         }, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('detail', response.data)
+
+    def test_renderer_matches_drf_json(self):
+        """orjson-рендерер выдаёт тот же JSON, что и стандартный рендерер DRF."""
+        data = {
+            'price': Decimal('1499.90'),
+            'createdAt': timezone.now(),
+            'items': [{'id': 1, 'name': 'Конструктор'}],
+        }
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
@@ -90,9 +90,11 @@ urlpatterns = [
     path('api/admin/analytics/user-activity/', views.AdminUserActivityView.as_view(), name='admin-user-activity'),
     path('api/admin/price-adjustment/', views.AdminPriceAdjustmentView.as_view(), name='admin-price-adjustment'),
     path('api/admin/data-export/', views.AdminDataExportView.as_view(), name='admin-data-export'),
+    path('api/admin/data-export/jobs/<str:task_id>/', views.AdminDataExportJobView.as_view(), name='admin-data-export-job'),
     path('api/admin/data-import/', views.AdminDataImportView.as_view(), name='admin-data-import'),
     path('api/admin/backups/', views.AdminBackupListView.as_view(), name='admin-backups'),
     path('api/admin/backups/download/<str:filename>/', views.AdminBackupDownloadView.as_view(), name='admin-backup-download'),
     path('api/admin/backups/delete/<str:filename>/', views.AdminBackupDeleteView.as_view(), name='admin-backup-delete'),
     path('api/admin/backups/restore/', views.AdminBackupRestoreView.as_view(), name='admin-backup-restore'),
+    path('api/admin/backups/task/<str:task_id>/', views.AdminBackupTaskView.as_view(), name='admin-backup-task'),
 ]
\ No newline at end of file
@@ -4,28 +4,35 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.exceptions import PermissionDenied, ValidationError as DRFValidationError
+from rest_framework.permissions import IsAuthenticated, AllowAny, SAFE_METHODS
+from rest_framework.exceptions import ValidationError as DRFValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth import authenticate
-from django.db import models, transaction, IntegrityError, connection
-from django.db.models import Q, Sum, Count, Avg, F
-from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
-from django.http import HttpResponse
-from datetime import datetime, timedelta
+from django.db import models, transaction, IntegrityError, DatabaseError, connection
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, Sum, Count, Avg, F, Value
+from django.db.models.functions import Cast, Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from urllib.parse import quote
+from datetime import date, datetime, timedelta
+import codecs
 import csv
+import hashlib
 import io
 import json as _json
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Border, Side
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+    # Стиль шапки отчётов создаём один раз, а не на каждую ячейку
+    _HEADER_FONT = Font(bold=True, color="FFFFFF")
+    _HEADER_FILL = PatternFill(start_color="DC2626", end_color="DC2626", fill_type="solid")
     OPENPYXL_AVAILABLE = True
-    print(">>> OPENPYXL LOADED SUCCESSFULLY <<<")
-except Exception as e:
-    OPENPYXL_AVAILABLE = False
-    import traceback
-    print(f">>> OPENPYXL IMPORT ERROR: {type(e).__name__}: {e} <<<")
-    traceback.print_exc()
+except ImportError:
+    OPENPYXL_AVAILABLE = False  # выгрузка в Excel недоступна, отдаём CSV
 from django.shortcuts import render, redirect
 from django.utils import timezone
 from django.conf import settings
@@ -34,10 +41,18 @@ from decimal import Decimal
 from pathlib import Path
 import logging
 import subprocess
+from celery.result import AsyncResult
+from joybox.celery import app as celery_app
 from .models import Product, Category, Brand, ProductImage, ProductAttribute, Review, Wishlist, ParentChild, User, Order, OrderItem, OrderStatus, Address, Role, AuditLog, Cart
 
 logger = logging.getLogger(__name__)
-from .audit import log_audit, model_to_log_dict, get_pk, set_audit_user
+from .audit import log_audit, model_to_log_dict, snapshot_log_fields, diff_log_dicts, get_pk, set_audit_user
+from .tasks import EXPORT_DIR, create_backup_task, restore_backup_task, export_table_task
+from .permissions import (
+    IsAdminOrManager, IsAdmin, get_role_name,
+    ROLE_ADMIN, ROLE_BUYER, ADMIN_MANAGER_ROLES,
+)
+from .pagination import AdminCursorPagination, ProductCursorPagination
 from .serializers import (
     ProductListSerializer, 
     ProductDetailSerializer,
@@ -82,6 +97,7 @@ from django.db.models import Count, Avg
 from django.conf import settings
 from django.core.files.storage import default_storage
 import os
+import tempfile
 import uuid
 
 class CategoryListView(generics.ListAPIView):
@@ -185,21 +201,18 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 def info_view(request):
-    if request.user.is_authenticated:
-        if hasattr(request.user, 'roleId') and request.user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return redirect('/admin-panel/')
+    if get_role_name(request.user) in ADMIN_MANAGER_ROLES:
+        return redirect('/admin-panel/')
     return render(request, 'info.html')
 
 def catalog_page(request):
-    if request.user.is_authenticated:
-        if hasattr(request.user, 'roleId') and request.user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return redirect('/admin-panel/')
+    if get_role_name(request.user) in ADMIN_MANAGER_ROLES:
+        return redirect('/admin-panel/')
     return render(request, 'catalog.html')
 
 def product_detail_page(request, pk):
-    if request.user.is_authenticated:
-        if hasattr(request.user, 'roleId') and request.user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return redirect('/admin-panel/')
+    if get_role_name(request.user) in ADMIN_MANAGER_ROLES:
+        return redirect('/admin-panel/')
     return render(request, 'product_detail.html', {'product_id': pk})
 
 def profile_page(request):
@@ -243,7 +256,7 @@ class WishlistListView(generics.ListAPIView):
     
     def get_queryset(self):
         user = self.request.user
-        if user.roleId.roleName == 'Покупатель':
+        if get_role_name(user) == ROLE_BUYER:
             children = User.objects.filter(child_relations__userId=user)
             return Wishlist.objects.filter(
                 models.Q(userId=user) | models.Q(userId__in=children)
@@ -277,7 +290,7 @@ class WishlistDestroyView(generics.DestroyAPIView):
 
 
 def _cart_allowed(user):
-    return hasattr(user, 'roleId') and user.roleId.roleName == 'Покупатель'
+    return get_role_name(user) == ROLE_BUYER
 
 
 class CartListView(generics.GenericAPIView):
@@ -341,7 +354,7 @@ class CartItemDetailView(generics.GenericAPIView):
 
 
 def _buyer_only(user):
-    return hasattr(user, 'roleId') and user.roleId.roleName == 'Покупатель'
+    return get_role_name(user) == ROLE_BUYER
 
 
 class UserAddressListView(generics.ListAPIView):
@@ -710,14 +723,14 @@ class ParentChildrenListView(generics.GenericAPIView):
         return ParentChild.objects.filter(userId=self.request.user).select_related('childId')
 
     def get(self, request, *args, **kwargs):
-        if request.user.roleId.roleName != 'Покупатель':
+        if get_role_name(request.user) != ROLE_BUYER:
             return Response({'detail': 'Доступно только покупателям (родителям).'}, status=status.HTTP_403_FORBIDDEN)
         links = self.get_queryset()
         serializer = ChildAccountSerializer(links, many=True)
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        if request.user.roleId.roleName != 'Покупатель':
+        if get_role_name(request.user) != ROLE_BUYER:
             return Response({'detail': 'Доступно только покупателям (родителям).'}, status=status.HTTP_403_FORBIDDEN)
         serializer = ChildAccountCreateSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
@@ -739,7 +752,7 @@ class ParentChildDetailView(generics.GenericAPIView):
         return link, link.childId
 
     def get(self, request, pk, *args, **kwargs):
-        if request.user.roleId.roleName != 'Покупатель':
+        if get_role_name(request.user) != ROLE_BUYER:
             return Response({'detail': 'Доступно только покупателям (родителям).'}, status=status.HTTP_403_FORBIDDEN)
         link, child = self.get_link_and_child(request, pk)
         if not link:
@@ -748,7 +761,7 @@ class ParentChildDetailView(generics.GenericAPIView):
         return Response(serializer.data)
 
     def patch(self, request, pk, *args, **kwargs):
-        if request.user.roleId.roleName != 'Покупатель':
+        if get_role_name(request.user) != ROLE_BUYER:
             return Response({'detail': 'Доступно только покупателям (родителям).'}, status=status.HTTP_403_FORBIDDEN)
         link, child = self.get_link_and_child(request, pk)
         if not link:
@@ -760,83 +773,66 @@ class ParentChildDetailView(generics.GenericAPIView):
         return Response(out.data)
 
     def delete(self, request, pk, *args, **kwargs):
-        if request.user.roleId.roleName != 'Покупатель':
+        if get_role_name(request.user) != ROLE_BUYER:
             return Response({'detail': 'Доступно только покупателям (родителям).'}, status=status.HTTP_403_FORBIDDEN)
-        link, _ = self.get_link_and_child(request, pk)
-        if not link:
+        # Один DELETE без предварительной выборки связи и ребёнка
+        deleted, _ = ParentChild.objects.filter(userId=request.user, childId_id=pk).delete()
+        if not deleted:
             return Response({'detail': 'Привязанный ребёнок не найден.'}, status=status.HTTP_404_NOT_FOUND)
-        link.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class AdminPanelView(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     
     def get(self, request, *args, **kwargs):
-        user = request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            is_admin = user.roleId.roleName == 'Администратор'
-            return Response({
-                'message': 'Welcome to admin panel',
-                'role': user.roleId.roleName,
-                'is_admin': is_admin
-            })
-        else:
-            return Response({
-                'message': 'Access denied. Redirecting to main site.',
-                'redirect': '/'
-            }, status=403)
+        role_name = request.user.roleId.roleName
+        return Response({
+            'message': 'Welcome to admin panel',
+            'role': role_name,
+            'is_admin': role_name == ROLE_ADMIN
+        })
 
 class AdminDashboardView(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     
     def get(self, request, *args, **kwargs):
-        user = request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            total_products = Product.objects.count()
-            total_users = User.objects.count()
-            total_orders = Order.objects.count()
-            total_revenue = sum(order.total for order in Order.objects.all())
-            
-            return Response({
-                'total_products': total_products,
-                'total_users': total_users,
-                'total_orders': total_orders,
-                'total_revenue': float(total_revenue)
-            })
-        else:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
+        total_products = Product.objects.count()
+        total_users = User.objects.count()
+        total_orders = Order.objects.count()
+        total_revenue = sum(order.total for order in Order.objects.all())
+        
+        return Response({
+            'total_products': total_products,
+            'total_users': total_users,
+            'total_orders': total_orders,
+            'total_revenue': float(total_revenue)
+        })
 
 class AdminProductsView(generics.ListAPIView):
     serializer_class = ProductListSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+    pagination_class = ProductCursorPagination
     
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Product.objects.all().select_related('categoryId', 'brandId')
-        else:
-            return Product.objects.none()
+        return Product.objects.all().select_related('categoryId', 'brandId')
 
-class AdminProductCreateView(generics.CreateAPIView):
-    serializer_class = ProductCreateUpdateSerializer
-    permission_classes = [IsAuthenticated]
+# Для изменяющих запросов один раз передаёт пользователя триггерам аудита
+# в БД — сразу после аутентификации и проверки прав
+class AuditUserMixin:
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            set_audit_user(request.user)
 
-    def perform_create(self, serializer):
-        user = self.request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            raise PermissionDenied("Доступ запрещён.")
-        set_audit_user(user)  # для триггера аудита в БД
-        serializer.save()
-        # Аудит выполняется автоматически триггером trg_product_audit
 
-    def create(self, request, *args, **kwargs):
-        if request.user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
-        return super().create(request, *args, **kwargs)
+# Аудит товаров выполняется автоматически триггером trg_product_audit
+class AdminProductCreateView(AuditUserMixin, generics.CreateAPIView):
+    serializer_class = ProductCreateUpdateSerializer
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
 
-class AdminProductDetailView(generics.RetrieveUpdateDestroyAPIView):
-    permission_classes = [IsAuthenticated]
+class AdminProductDetailView(AuditUserMixin, generics.RetrieveUpdateDestroyAPIView):
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     lookup_field = 'pk'
     
     def get_serializer_class(self):
@@ -845,128 +841,101 @@ class AdminProductDetailView(generics.RetrieveUpdateDestroyAPIView):
         return ProductCreateUpdateSerializer
     
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Product.objects.all().select_related('categoryId', 'brandId').prefetch_related('productimage_set', 'productattribute_set')
-        else:
-            return Product.objects.none()
-    
-    def update(self, request, *args, **kwargs):
-        user = request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
-        set_audit_user(user)  # для триггера аудита в БД
-        response = super().update(request, *args, **kwargs)
-        # Аудит выполняется автоматически триггером trg_product_audit
-        return response
-
-    def destroy(self, request, *args, **kwargs):
-        user = request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
-        set_audit_user(user)  # для триггера аудита в БД
-        response = super().destroy(request, *args, **kwargs)
-        # Аудит выполняется автоматически триггером trg_product_audit
-        return response
+        return Product.objects.all().select_related('categoryId', 'brandId').prefetch_related('productimage_set', 'productattribute_set')
 
 
 class ProductImageViewSet(viewsets.ModelViewSet):
     serializer_class = ProductImageSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            product_id = self.kwargs.get('product_pk')
-            if product_id:
-                return ProductImage.objects.filter(productId=product_id)
-            return ProductImage.objects.all()
-        return ProductImage.objects.none()
+        product_id = self.kwargs.get('product_pk')
+        if product_id:
+            return ProductImage.objects.filter(productId=product_id)
+        return ProductImage.objects.all()
 
     def perform_create(self, serializer):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            product_id = self.kwargs.get('product_pk')
-            if product_id:
-                product = Product.objects.get(productId=product_id)
-                serializer.save(productId=product)
-                log_audit(user, 'CREATE', 'productImage', get_pk(serializer.instance), old_values=None, new_values=model_to_log_dict(serializer.instance))
-        else:
-            raise PermissionDenied("Доступ запрещён.")
+        product_id = self.kwargs.get('product_pk')
+        if product_id:
+            serializer.save(productId_id=product_id)
+            log_audit(self.request.user, 'CREATE', 'productImage', get_pk(serializer.instance), old_values=None, new_values=model_to_log_dict(serializer.instance))
 
     def perform_update(self, serializer):
-        user = self.request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            raise PermissionDenied("Доступ запрещён.")
-        old_values = model_to_log_dict(serializer.instance)
+        snapshot = snapshot_log_fields(serializer.instance, serializer.validated_data)
         super().perform_update(serializer)
-        log_audit(user, 'UPDATE', 'productImage', get_pk(serializer.instance), old_values=old_values, new_values=model_to_log_dict(serializer.instance))
+        old_values, new_values = diff_log_dicts(snapshot, serializer.instance, serializer.validated_data)
+        if new_values:
+            log_audit(self.request.user, 'UPDATE', 'productImage', get_pk(serializer.instance), old_values=old_values, new_values=new_values)
 
     def perform_destroy(self, instance):
-        user = self.request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            raise PermissionDenied("Доступ запрещён.")
         old_values = model_to_log_dict(instance)
         record_id = get_pk(instance)
         super().perform_destroy(instance)
-        log_audit(user, 'DELETE', 'productImage', record_id, old_values=old_values, new_values=None)
+        log_audit(self.request.user, 'DELETE', 'productImage', record_id, old_values=old_values, new_values=None)
 
 class ProductAttributeViewSet(viewsets.ModelViewSet):
     serializer_class = ProductAttributeSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            product_id = self.kwargs.get('product_pk')
-            if product_id:
-                return ProductAttribute.objects.filter(productId=product_id)
-            return ProductAttribute.objects.all()
-        return ProductAttribute.objects.none()
+        product_id = self.kwargs.get('product_pk')
+        if product_id:
+            return ProductAttribute.objects.filter(productId=product_id)
+        return ProductAttribute.objects.all()
     
     def perform_create(self, serializer):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            product_id = self.kwargs.get('product_pk')
-            if product_id:
-                product = Product.objects.get(productId=product_id)
-                serializer.save(productId=product)
-                log_audit(user, 'CREATE', 'productAttribute', get_pk(serializer.instance), old_values=None, new_values=model_to_log_dict(serializer.instance))
-        else:
-            raise PermissionDenied("Доступ запрещён.")
+        product_id = self.kwargs.get('product_pk')
+        if product_id:
+            serializer.save(productId_id=product_id)
+            log_audit(self.request.user, 'CREATE', 'productAttribute', get_pk(serializer.instance), old_values=None, new_values=model_to_log_dict(serializer.instance))
 
     def perform_update(self, serializer):
-        user = self.request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            raise PermissionDenied("Доступ запрещён.")
-        old_values = model_to_log_dict(serializer.instance)
+        snapshot = snapshot_log_fields(serializer.instance, serializer.validated_data)
         super().perform_update(serializer)
-        log_audit(user, 'UPDATE', 'productAttribute', get_pk(serializer.instance), old_values=old_values, new_values=model_to_log_dict(serializer.instance))
+        old_values, new_values = diff_log_dicts(snapshot, serializer.instance, serializer.validated_data)
+        if new_values:
+            log_audit(self.request.user, 'UPDATE', 'productAttribute', get_pk(serializer.instance), old_values=old_values, new_values=new_values)
 
     def perform_destroy(self, instance):
-        user = self.request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            raise PermissionDenied("Доступ запрещён.")
         old_values = model_to_log_dict(instance)
         record_id = get_pk(instance)
         super().perform_destroy(instance)
-        log_audit(user, 'DELETE', 'productAttribute', record_id, old_values=old_values, new_values=None)
+        log_audit(self.request.user, 'DELETE', 'productAttribute', record_id, old_values=old_values, new_values=None)
+
+
+# Сигнатуры (magic bytes) поддерживаемых изображений и их расширения
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+)
+
+
+# Определяем тип изображения по первым байтам файла, а не по заголовку
+# Content-Type, который задаёт клиент
+def _sniff_image_ext(file):
+    head = file.read(12)
+    file.seek(0)
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return '.webp'
+    for signature, ext in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    return None
 
 
 class ProductImageUploadView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request):
-        user = request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
         file = request.FILES.get('file')
         if not file:
             return Response({'detail': 'Файл не предоставлен.'}, status=400)
-        if not file.content_type.startswith('image/'):
+        ext = _sniff_image_ext(file)
+        if ext is None:
             return Response({'detail': 'Файл должен быть изображением.'}, status=400)
-        ext = os.path.splitext(file.name)[1] or '.jpg'
         filename = f"{uuid.uuid4().hex}{ext}"
         path = os.path.join('products', filename)
         saved_path = default_storage.save(path, file)
@@ -975,18 +944,21 @@ class ProductImageUploadView(APIView):
 
 
 # Admin CRUD для категорий и брендов
+# Запоминает объект, загруженный get_object(), чтобы update/destroy
+# и их аудит не перечитывали запись из БД повторно
+class CachedObjectMixin:
+    def get_object(self):
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object()
+        return self._object
+
+
 class AdminCategoryListCreateView(generics.ListCreateAPIView):
     serializer_class = CategorySerializer
-    permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        if self.request.user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Category.objects.all()
-        return Category.objects.none()
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+    queryset = Category.objects.all()
 
     def create(self, request, *args, **kwargs):
-        if request.user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
         response = super().create(request, *args, **kwargs)
         if response.status_code == 201 and hasattr(response, 'data') and response.data.get('categoryId'):
             instance = Category.objects.get(categoryId=response.data['categoryId'])
@@ -994,30 +966,20 @@ class AdminCategoryListCreateView(generics.ListCreateAPIView):
         return response
 
 
-class AdminCategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AdminCategoryDetailView(CachedObjectMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CategorySerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     lookup_url_kwarg = 'pk'
+    queryset = Category.objects.all()
 
-    def get_queryset(self):
-        if self.request.user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Category.objects.all()
-        return Category.objects.none()
-
-    def update(self, request, *args, **kwargs):
-        if request.user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
-        instance = self.get_object()
-        old_values = model_to_log_dict(instance)
-        response = super().update(request, *args, **kwargs)
-        if response.status_code == 200:
-            instance.refresh_from_db()
-            log_audit(request.user, 'UPDATE', 'category', get_pk(instance), old_values=old_values, new_values=model_to_log_dict(instance))
-        return response
+    def perform_update(self, serializer):
+        snapshot = snapshot_log_fields(serializer.instance, serializer.validated_data)
+        super().perform_update(serializer)
+        old_values, new_values = diff_log_dicts(snapshot, serializer.instance, serializer.validated_data)
+        if new_values:
+            log_audit(self.request.user, 'UPDATE', 'category', get_pk(serializer.instance), old_values=old_values, new_values=new_values)
 
     def destroy(self, request, *args, **kwargs):
-        if request.user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
         instance = self.get_object()
         old_values = model_to_log_dict(instance)
         record_id = get_pk(instance)
@@ -1029,16 +991,10 @@ class AdminCategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 class AdminBrandListCreateView(generics.ListCreateAPIView):
     serializer_class = BrandSerializer
-    permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        if self.request.user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Brand.objects.all()
-        return Brand.objects.none()
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+    queryset = Brand.objects.all()
 
     def create(self, request, *args, **kwargs):
-        if request.user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
         response = super().create(request, *args, **kwargs)
         if response.status_code == 201 and hasattr(response, 'data') and response.data.get('brandId'):
             instance = Brand.objects.get(brandId=response.data['brandId'])
@@ -1046,30 +1002,20 @@ class AdminBrandListCreateView(generics.ListCreateAPIView):
         return response
 
 
-class AdminBrandDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AdminBrandDetailView(CachedObjectMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BrandSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     lookup_url_kwarg = 'pk'
+    queryset = Brand.objects.all()
 
-    def get_queryset(self):
-        if self.request.user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Brand.objects.all()
-        return Brand.objects.none()
-
-    def update(self, request, *args, **kwargs):
-        if request.user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
-        instance = self.get_object()
-        old_values = model_to_log_dict(instance)
-        response = super().update(request, *args, **kwargs)
-        if response.status_code == 200:
-            instance.refresh_from_db()
-            log_audit(request.user, 'UPDATE', 'brand', get_pk(instance), old_values=old_values, new_values=model_to_log_dict(instance))
-        return response
+    def perform_update(self, serializer):
+        snapshot = snapshot_log_fields(serializer.instance, serializer.validated_data)
+        super().perform_update(serializer)
+        old_values, new_values = diff_log_dicts(snapshot, serializer.instance, serializer.validated_data)
+        if new_values:
+            log_audit(self.request.user, 'UPDATE', 'brand', get_pk(serializer.instance), old_values=old_values, new_values=new_values)
 
     def destroy(self, request, *args, **kwargs):
-        if request.user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
         instance = self.get_object()
         old_values = model_to_log_dict(instance)
         record_id = get_pk(instance)
@@ -1081,22 +1027,18 @@ class AdminBrandDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 class AdminUsersView(generics.ListAPIView):
     serializer_class = UserSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = AdminCursorPagination
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName == 'Администратор':
-            return User.objects.all().select_related('roleId')
-        return User.objects.none()
+        return User.objects.all().select_related('roleId')
 
 
 class AdminUserCreateView(generics.CreateAPIView):
     serializer_class = UserCreateUpdateSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
 
     def perform_create(self, serializer):
-        if self.request.user.roleId.roleName != 'Администратор':
-            raise PermissionDenied("Доступ запрещён.")
         serializer.save()
         log_audit(
             self.request.user, 'CREATE', 'user',
@@ -1105,56 +1047,40 @@ class AdminUserCreateView(generics.CreateAPIView):
             new_values=model_to_log_dict(serializer.instance),
         )
 
-    def create(self, request, *args, **kwargs):
-        if request.user.roleId.roleName != 'Администратор':
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
-        return super().create(request, *args, **kwargs)
-
 
 class RoleListView(generics.ListAPIView):
     serializer_class = RoleSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
+    queryset = Role.objects.all()
 
-    def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName == 'Администратор':
-            return Role.objects.all()
-        return Role.objects.none()
 
-
-class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AdminUserDetailView(AuditUserMixin, CachedObjectMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserCreateUpdateSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
     lookup_field = 'pk'
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName == 'Администратор':
-            return User.objects.all().select_related('roleId')
-        return User.objects.none()
+        return User.objects.all().select_related('roleId')
 
     def update(self, request, *args, **kwargs):
-        if request.user.roleId.roleName != 'Администратор':
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
         instance = self.get_object()
         if instance.userId == request.user.userId and request.data.get('is_active') is False:
             return Response({'detail': 'Нельзя заблокировать свой аккаунт.'}, status=400)
-        old_values = model_to_log_dict(instance)
-        response = super().update(request, *args, **kwargs)
-        if response.status_code == 200:
-            instance.refresh_from_db()
-            log_audit(request.user, 'UPDATE', 'user', get_pk(instance), old_values=old_values, new_values=model_to_log_dict(instance))
-        return response
+        return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        snapshot = snapshot_log_fields(serializer.instance, serializer.validated_data)
+        super().perform_update(serializer)
+        old_values, new_values = diff_log_dicts(snapshot, serializer.instance, serializer.validated_data)
+        if new_values:
+            log_audit(self.request.user, 'UPDATE', 'user', get_pk(serializer.instance), old_values=old_values, new_values=new_values)
 
     def destroy(self, request, *args, **kwargs):
-        if request.user.roleId.roleName != 'Администратор':
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
         instance = self.get_object()
         if instance.userId == request.user.userId:
             return Response({'detail': 'Нельзя удалить собственный аккаунт.'}, status=400)
         old_values = model_to_log_dict(instance)
         record_id = get_pk(instance)
-        set_audit_user(request.user)  # для триггера аудита в БД
         response = super().destroy(request, *args, **kwargs)
         if response.status_code in (200, 204):
             log_audit(request.user, 'DELETE', 'user', record_id, old_values=old_values, new_values=None)
@@ -1162,58 +1088,45 @@ class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 class AdminOrdersView(generics.ListAPIView):
     serializer_class = OrderSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+    pagination_class = AdminCursorPagination
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Order.objects.all().select_related('userId', 'orderStatusId')
-        return Order.objects.none()
+        return Order.objects.all().select_related('userId', 'orderStatusId')
 
 
-class AdminOrderDetailView(generics.RetrieveUpdateAPIView):
+# Аудит заказов выполняется автоматически триггером trg_order_audit
+class AdminOrderDetailView(AuditUserMixin, generics.RetrieveUpdateAPIView):
     serializer_class = OrderDetailSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     lookup_url_kwarg = 'pk'
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Order.objects.all().select_related('userId', 'orderStatusId', 'addressId').prefetch_related('orderitem_set__productId')
-        return Order.objects.none()
+        return Order.objects.all().select_related('userId', 'orderStatusId', 'addressId').prefetch_related('orderitem_set__productId')
 
     def put(self, request, *args, **kwargs):
         return self.partial_update(request, *args, **kwargs)
 
-    def perform_update(self, serializer):
-        set_audit_user(self.request.user)  # для триггера аудита в БД
-        super().perform_update(serializer)
-        # Аудит выполняется автоматически триггером trg_order_audit
-
 
-class AdminOrderMarkPaidView(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
+class AdminOrderMarkPaidView(AuditUserMixin, generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Order.objects.all().select_related('orderStatusId')
-        return Order.objects.none()
+        return Order.objects.all().select_related('orderStatusId')
 
     def post(self, request, pk, *args, **kwargs):
         try:
-            order = self.get_queryset().get(orderId=pk)
-            if order.paymentType not in [Order.PAYMENT_CARD, Order.PAYMENT_CASH]:
-                return Response(
-                    {'detail': 'Этот заказ не предназначен для оплаты при получении.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if order.paymentStatus == Order.PAYMENT_STATUS_PAID:
-                return Response({'detail': 'Заказ уже отмечен как оплаченный.'}, status=status.HTTP_400_BAD_REQUEST)
-            set_audit_user(request.user)  # для триггера аудита в БД
-            order.paymentStatus = Order.PAYMENT_STATUS_PAID
-            order.save(update_fields=['paymentStatus'])
+            # Проверка и смена статуса одним атомарным UPDATE
+            updated = Order.objects.filter(
+                orderId=pk,
+                paymentType__in=[Order.PAYMENT_CARD, Order.PAYMENT_CASH],
+            ).exclude(
+                paymentStatus=Order.PAYMENT_STATUS_PAID,
+            ).update(paymentStatus=Order.PAYMENT_STATUS_PAID)
             # Аудит выполняется автоматически триггером trg_order_audit
+            if not updated:
+                return self._not_updated_response(pk)
+            order = self.get_queryset().get(orderId=pk)
         except Order.DoesNotExist:
             return Response({'detail': 'Заказ не найден.'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -1222,50 +1135,87 @@ class AdminOrderMarkPaidView(generics.GenericAPIView):
         serializer = OrderDetailSerializer(order)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    # Причина, по которой UPDATE не затронул ни одной строки
+    def _not_updated_response(self, pk):
+        row = Order.objects.filter(orderId=pk).values('paymentType').first()
+        if row is None:
+            return Response({'detail': 'Заказ не найден.'}, status=status.HTTP_404_NOT_FOUND)
+        if row['paymentType'] not in [Order.PAYMENT_CARD, Order.PAYMENT_CASH]:
+            return Response(
+                {'detail': 'Этот заказ не предназначен для оплаты при получении.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'detail': 'Заказ уже отмечен как оплаченный.'}, status=status.HTTP_400_BAD_REQUEST)
+
 
 class AdminOrderStatusListView(generics.ListAPIView):
     serializer_class = OrderStatusSerializer
-    permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return OrderStatus.objects.all()
-        return OrderStatus.objects.none()
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+    queryset = OrderStatus.objects.all()
 
 
 class AdminAuditLogListView(generics.ListAPIView):
     serializer_class = AuditLogSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = AdminCursorPagination
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName == 'Администратор':
-            return AuditLog.objects.all().select_related('userId').order_by('-createdAt')
-        return AuditLog.objects.none()
+        return AuditLog.objects.all().select_related('userId').order_by('-createdAt')
+
+
+# Статистика отзывов товара из материализованного представления v_review_stats:
+# один LEFT JOIN по уникальному индексу вместо агрегации по всей таблице review.
+# Товар, ещё не попавший в представление, получает нули, а не NULL —
+# иначе сортировка по статистике ломает курсор пагинации
+def _with_review_stats(queryset):
+    return queryset.annotate(
+        productReviewCount=Coalesce(F('productId__reviewStats__reviewCount'), 0),
+        productAvgRating=Coalesce(
+            F('productId__reviewStats__avgRating'), Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=3, decimal_places=2),
+        ),
+    )
+
+
+# Сортировка отзывов с reviewId последним ключом: у многих отзывов одинаковая
+# статистика товара, а курсору нужен однозначный порядок
+class ReviewOrderingFilter(filters.OrderingFilter):
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') == 'reviewId' for field in ordering):
+            ordering = [*ordering, '-reviewId']
+        return ordering
 
 
 class AdminReviewListView(generics.ListAPIView):
     serializer_class = AdminReviewSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+    pagination_class = AdminCursorPagination
+    filter_backends = [ReviewOrderingFilter]
+    ordering_fields = ['createdAt', 'rating', 'productReviewCount', 'productAvgRating']
+    ordering = ['-createdAt']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Review.objects.all().select_related('userId', 'productId').order_by('-createdAt')
-        return Review.objects.none()
+        queryset = _with_review_stats(Review.objects.all().select_related('userId', 'productId'))
+        min_avg_rating = self.request.query_params.get('min_avg_rating')
+        if min_avg_rating:
+            try:
+                min_avg_rating = Decimal(min_avg_rating)
+            except ArithmeticError:
+                min_avg_rating = None
+            # NaN и Infinity разбираются Decimal, но не годятся для фильтра
+            if min_avg_rating is not None and min_avg_rating.is_finite():
+                queryset = queryset.filter(productAvgRating__gte=min_avg_rating)
+        return queryset
 
 
 class AdminReviewDetailView(generics.RetrieveDestroyAPIView):
     serializer_class = AdminReviewSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
     lookup_url_kwarg = 'pk'
 
     def get_queryset(self):
-        user = self.request.user
-        if user.roleId.roleName in ['Администратор', 'Менеджер']:
-            return Review.objects.all().select_related('userId', 'productId')
-        return Review.objects.none()
+        return _with_review_stats(Review.objects.all().select_related('userId', 'productId'))
 
     def perform_destroy(self, instance):
         record_id = get_pk(instance)
@@ -1276,33 +1226,216 @@ class AdminReviewDetailView(generics.RetrieveDestroyAPIView):
             record_id, old_values=old_values, new_values=None,
         )
 
+# Дата из параметра запроса в формате ГГГГ-ММ-ДД (None, если не задана или некорректна)
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+# Оплаченные заказы за период (границы включительно, по локальной дате)
+def _paid_orders(date_from_parsed, date_to_parsed):
+    orders_qs = Order.objects.filter(paymentStatus=Order.PAYMENT_STATUS_PAID)
+    if date_from_parsed:
+        orders_qs = orders_qs.filter(createdAt__date__gte=date_from_parsed)
+    if date_to_parsed:
+        orders_qs = orders_qs.filter(createdAt__date__lte=date_to_parsed)
+    return orders_qs
+
+
+# Сколько строк CSV собирается в один кусок потокового ответа
+CSV_CHUNK_ROWS = 500
+
+
+# CSV кусками байтов: csv.writer пишет через TextIOWrapper сразу в UTF-8,
+# так что ответу не нужно перекодировать каждую строку отдельно
+def _csv_chunks(headers, rows, **writer_options):
+    yield codecs.BOM_UTF8  # чтобы Excel корректно открыл UTF-8
+    buffer = io.BytesIO()
+    text = io.TextIOWrapper(buffer, encoding='utf-8', newline='', write_through=True)
+    writer = csv.writer(text, **writer_options)
+    writer.writerow(headers)
+    pending = 1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= CSV_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+# Потоковая отдача CSV: строки пишутся в ответ по мере чтения из БД
+def _streaming_csv_response(headers, rows, filename):
+    response = StreamingHttpResponse(_csv_chunks(headers, rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+# Excel в режиме write_only: строки сбрасываются во временный файл, а не
+# накапливаются в памяти в виде ячеек листа
+def _write_only_excel_response(headers, rows, filename, title='Отчёт'):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    # В write_only ширину колонок задаём до записи строк
+    for col_idx, header in enumerate(headers, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = max(len(str(header)) + 2, 14)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = _HEADER_FONT
+        cell.fill = _HEADER_FILL
+        header_cells.append(cell)
+    ws.append(header_cells)
+    for row in rows:
+        ws.append(row)
+
+    output = io.BytesIO()
+    wb.save(output)
+    response = HttpResponse(
+        output.getvalue(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
+    return response
+
+
+SALES_EXPORT_HEADERS = ['Дата', 'Выручка (₽)', 'Количество заказов', 'Средний чек (₽)']
+PRODUCTS_EXPORT_HEADERS = ['Товар', 'Категория', 'Бренд', 'Продано (шт.)', 'Выручка (₽)', 'Заказов']
+
+
+# Строки отчёта о продажах по дням + итоговая строка
+def _sales_export_rows(orders_qs):
+    sales_data = orders_qs.annotate(
+        date=TruncDate('createdAt')
+    ).values('date').annotate(
+        revenue=Sum('total'),
+        orders_count=Count('orderId'),
+        avg_check=Avg('total')
+    ).order_by('date')
+
+    # Итоги накапливаем по ходу выгрузки, без повторного прохода по заказам
+    total_revenue = 0
+    total_orders = 0
+    # Серверный курсор: в памяти не больше chunk_size строк
+    for item in sales_data.iterator(chunk_size=2000):
+        total_revenue += item['revenue'] or 0
+        total_orders += item['orders_count']
+        yield [
+            item['date'].strftime('%Y-%m-%d') if item['date'] else '',
+            float(item['revenue'] or 0),
+            item['orders_count'],
+            round(float(item['avg_check'] or 0), 2),
+        ]
+    yield [
+        'ИТОГО',
+        float(total_revenue),
+        total_orders,
+        round(float(total_revenue) / total_orders, 2) if total_orders else 0,
+    ]
+
+
+# Строки отчёта о популярности товаров
+def _products_export_rows(orders_qs):
+    products_data = OrderItem.objects.filter(
+        orderId__in=orders_qs
+    ).values(
+        product_name=F('productId__productName'),
+        category_name=F('productId__categoryId__categoryName'),
+        brand_name=F('productId__brandId__brandName'),
+    ).annotate(
+        total_sold=Sum('quantity'),
+        revenue=Sum(F('quantity') * F('unitPrice')),
+        orders_count=Count('orderId', distinct=True)
+    ).order_by('-total_sold')
+
+    for item in products_data.iterator(chunk_size=2000):
+        yield [
+            item['product_name'],
+            item['category_name'] or 'Без категории',
+            item['brand_name'] or 'Без бренда',
+            int(item['total_sold'] or 0),
+            float(item['revenue'] or 0),
+            item['orders_count'],
+        ]
+
+
+# Готовые файлы выгрузок храним в кэше 5 минут. Строки выгрузок читаются
+# из живых таблиц, а не из материализованных представлений, так что
+# это предел устаревания файла относительно текущих данных
+EXPORT_CACHE_TIMEOUT = 300
+EXPORT_CACHE_MAX_BYTES = 5 * 1024 * 1024
+
+
+# Потоковый ответ попадает в кэш, только если клиент дочитал его до конца
+def _cache_streaming_content(chunks, cache_key, content_type, disposition):
+    parts = []
+    size = 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size > EXPORT_CACHE_MAX_BYTES:
+                parts = None  # слишком большой файл не кэшируем
+            else:
+                parts.append(chunk)
+        yield chunk
+    if parts is not None:
+        cache.set(cache_key, (content_type, disposition, b''.join(parts)), EXPORT_CACHE_TIMEOUT)
+
+
+# Файл отчёта: Excel (если доступен openpyxl) или потоковый CSV.
+# Имя файла уже содержит тип отчёта и период, поэтому вместе
+# с форматом однозначно определяет содержимое и служит ключом кэша.
+# rows — генератор, при попадании в кэш запросы к БД не выполняются.
+def _export_response(headers, rows, export_format, filename):
+    cache_key = 'export:' + hashlib.sha1(f'{filename}|{export_format}'.encode()).hexdigest()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        content_type, disposition, body = cached
+        response = HttpResponse(body, content_type=content_type)
+        response['Content-Disposition'] = disposition
+        return response
+
+    if export_format == 'excel' and OPENPYXL_AVAILABLE:
+        response = _write_only_excel_response(headers, rows, filename)
+        if len(response.content) <= EXPORT_CACHE_MAX_BYTES:
+            cache.set(
+                cache_key,
+                (response['Content-Type'], response['Content-Disposition'], response.content),
+                EXPORT_CACHE_TIMEOUT,
+            )
+        return response
+
+    response = _streaming_csv_response(headers, rows, filename)
+    response.streaming_content = _cache_streaming_content(
+        response.streaming_content, cache_key,
+        response['Content-Type'], response['Content-Disposition'],
+    )
+    return response
+
+
 class AdminAnalyticsSalesView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
 
     def get(self, request):
-        user = request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=status.HTTP_403_FORBIDDEN)
-
         date_from = request.query_params.get('date_from')
         date_to = request.query_params.get('date_to')
         group_by = request.query_params.get('group_by', 'day')  
         export_format = request.query_params.get('export') 
-        
-        orders_qs = Order.objects.filter(paymentStatus=Order.PAYMENT_STATUS_PAID)
+        date_from_parsed = _parse_date(date_from)
+        date_to_parsed = _parse_date(date_to)
+        orders_qs = _paid_orders(date_from_parsed, date_to_parsed)
 
-        if date_from:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d')
-                orders_qs = orders_qs.filter(createdAt__date__gte=date_from_parsed)
-            except ValueError:
-                pass
-        if date_to:
-            try:
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d')
-                orders_qs = orders_qs.filter(createdAt__date__lte=date_to_parsed)
-            except ValueError:
-                pass
+        # Экспорт в файл если указан формат: сводные запросы ниже ему не нужны
+        if export_format in ['csv', 'excel']:
+            filename = f"sales_report_{date_from or 'all'}_{date_to or 'all'}"
+            return _export_response(SALES_EXPORT_HEADERS, _sales_export_rows(orders_qs), export_format, filename)
 
         total_stats = orders_qs.aggregate(
             total_revenue=Sum('total'),
@@ -1315,12 +1448,12 @@ class AdminAnalyticsSalesView(APIView):
         sales_report_sql = 'SELECT "month", "orderCount", "revenue", "avgOrderTotal" FROM v_sales_report'
         sales_params = []
         sales_conditions = []
-        if date_from:
+        if date_from_parsed:
             sales_conditions.append('"month" >= %s')
-            sales_params.append(date_from)
-        if date_to:
+            sales_params.append(date_from_parsed)
+        if date_to_parsed:
             sales_conditions.append('"month" <= %s')
-            sales_params.append(date_to)
+            sales_params.append(date_to_parsed)
         if sales_conditions:
             sales_report_sql += ' WHERE ' + ' AND '.join(sales_conditions)
         sales_report_sql += ' ORDER BY "month" DESC'
@@ -1345,88 +1478,15 @@ class AdminAnalyticsSalesView(APIView):
             avg_check=Avg('total')
         ).order_by('period')
 
-        # Продажи по категориям
-        sales_by_category = OrderItem.objects.filter(
-            orderId__in=orders_qs
-        ).values(
-            category_name=F('productId__categoryId__categoryName')
-        ).annotate(
-            total_sold=Sum('quantity'),
-            revenue=Sum(F('quantity') * F('unitPrice'))
-        ).order_by('-revenue')[:10]
-
-        # Продажи по брендам
-        sales_by_brand = OrderItem.objects.filter(
-            orderId__in=orders_qs
-        ).values(
-            brand_name=F('productId__brandId__brandName')
-        ).annotate(
-            total_sold=Sum('quantity'),
-            revenue=Sum(F('quantity') * F('unitPrice'))
-        ).order_by('-revenue')[:10]
-
-        # Распределение по статусам заказов (все заказы, не только оплаченные)
-        all_orders_qs = Order.objects.all()
-        if date_from:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d')
-                all_orders_qs = all_orders_qs.filter(createdAt__date__gte=date_from_parsed)
-            except ValueError:
-                pass
-        if date_to:
-            try:
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d')
-                all_orders_qs = all_orders_qs.filter(createdAt__date__lte=date_to_parsed)
-            except ValueError:
-                pass
-
-        orders_by_status = all_orders_qs.values(
-            status_name=F('orderStatusId__orderStatusName')
-        ).annotate(
-            count=Count('orderId')
-        ).order_by('-count')
-
-        # Распределение по способам оплаты
-        orders_by_payment = all_orders_qs.values('paymentType').annotate(
-            count=Count('orderId')
-        ).order_by('-count')
-
-        # Экспорт в файл если указан формат
-        if export_format in ['csv', 'excel']:
-            # Данные по дням для экспорта
-            sales_data = orders_qs.annotate(
-                date=TruncDate('createdAt')
-            ).values('date').annotate(
-                revenue=Sum('total'),
-                orders_count=Count('orderId'),
-                avg_check=Avg('total')
-            ).order_by('date')
-
-            rows = [
-                {
-                    'Дата': item['date'].strftime('%Y-%m-%d') if item['date'] else '',
-                    'Выручка (₽)': float(item['revenue'] or 0),
-                    'Количество заказов': item['orders_count'],
-                    'Средний чек (₽)': round(float(item['avg_check'] or 0), 2),
-                }
-                for item in sales_data
-            ]
+        # Продажи по категориям и брендам (топ-10) — один проход по
+        # "orderItem" через GROUPING SETS
+        sales_by_category, sales_by_brand = self._category_brand_breakdown(orders_qs)
 
-            # Добавляем итоговую строку
-            total = orders_qs.aggregate(
-                total_revenue=Sum('total'),
-                total_orders=Count('orderId'),
-                avg_check=Avg('total')
-            )
-            rows.append({
-                'Дата': 'ИТОГО',
-                'Выручка (₽)': float(total['total_revenue'] or 0),
-                'Количество заказов': total['total_orders'] or 0,
-                'Средний чек (₽)': round(float(total['avg_check'] or 0), 2),
-            })
-
-            filename = f"sales_report_{date_from or 'all'}_{date_to or 'all'}"
-            return self._create_export_response(rows, export_format, filename)
+        # Распределение по статусам заказов и способам оплаты (все заказы,
+        # не только оплаченные) — один проход по "order" через GROUPING SETS
+        orders_by_status, orders_by_payment = self._status_payment_breakdown(
+            date_from_parsed, date_to_parsed
+        )
 
         return Response({
             'summary': {
@@ -1443,36 +1503,10 @@ class AdminAnalyticsSalesView(APIView):
                 }
                 for item in sales_by_period
             ],
-            'sales_by_category': [
-                {
-                    'category': item['category_name'] or 'Без категории',
-                    'total_sold': item['total_sold'],
-                    'revenue': float(item['revenue'] or 0),
-                }
-                for item in sales_by_category
-            ],
-            'sales_by_brand': [
-                {
-                    'brand': item['brand_name'] or 'Без бренда',
-                    'total_sold': item['total_sold'],
-                    'revenue': float(item['revenue'] or 0),
-                }
-                for item in sales_by_brand
-            ],
-            'orders_by_status': [
-                {
-                    'status': item['status_name'] or 'Неизвестно',
-                    'count': item['count'],
-                }
-                for item in orders_by_status
-            ],
-            'orders_by_payment': [
-                {
-                    'payment_type': item['paymentType'],
-                    'count': item['count'],
-                }
-                for item in orders_by_payment
-            ],
+            'sales_by_category': sales_by_category,
+            'sales_by_brand': sales_by_brand,
+            'orders_by_status': orders_by_status,
+            'orders_by_payment': orders_by_payment,
             # Данные из SQL-представления v_sales_report (помесячная сводка)
             'monthly_report': [
                 {
@@ -1485,206 +1519,178 @@ class AdminAnalyticsSalesView(APIView):
             ],
         })
 
-    def _create_export_response(self, rows, export_format, filename):
-        print(f">>> SALES EXPORT: format={export_format}, OPENPYXL={OPENPYXL_AVAILABLE} <<<")
-        if not rows:
-            rows = [{'Нет данных': ''}]
-
-        if export_format == 'excel' and OPENPYXL_AVAILABLE:
-            print(">>> CREATING EXCEL FILE <<<")
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Отчёт"
-
-            headers = list(rows[0].keys())
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="DC2626", end_color="DC2626", fill_type="solid")
-            thin_border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
-
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = thin_border
-
-            for row_idx, row_data in enumerate(rows, 2):
-                for col_idx, header in enumerate(headers, 1):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=row_data[header])
-                    cell.border = thin_border
+    def _category_brand_breakdown(self, orders_qs, limit=10):
+        orders_sql, orders_params = orders_qs.values('orderId').query.sql_with_params()
+        sql = (
+            'SELECT c."categoryName", b."brandName", '
+            'GROUPING(c."categoryName") AS by_brand, '
+            'SUM(oi."quantity") AS total_sold, '
+            'SUM(oi."quantity" * oi."unitPrice") AS revenue '
+            'FROM "orderItem" oi '
+            'JOIN "product" p ON p."productId" = oi."productId" '
+            'LEFT JOIN "category" c ON c."categoryId" = p."categoryId" '
+            'LEFT JOIN "brand" b ON b."brandId" = p."brandId" '
+            f'WHERE oi."orderId" IN ({orders_sql}) '
+            'GROUP BY GROUPING SETS ((c."categoryName"), (b."brandName")) '
+            'ORDER BY revenue DESC'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, orders_params)
+            rows = cursor.fetchall()
 
-            for col_idx, header in enumerate(headers, 1):
-                max_length = max(len(str(header)), max(len(str(row[header])) for row in rows))
-                ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = max_length + 2
+        by_category = []
+        by_brand = []
+        for category_name, brand_name, by_brand_flag, total_sold, revenue in rows:
+            if by_brand_flag:
+                if len(by_brand) < limit:
+                    by_brand.append({
+                        'brand': brand_name or 'Без бренда',
+                        'total_sold': total_sold,
+                        'revenue': float(revenue or 0),
+                    })
+            elif len(by_category) < limit:
+                by_category.append({
+                    'category': category_name or 'Без категории',
+                    'total_sold': total_sold,
+                    'revenue': float(revenue or 0),
+                })
+        return by_category, by_brand
 
-            output = io.BytesIO()
-            wb.save(output)
-            output.seek(0)
+    def _status_payment_breakdown(self, date_from, date_to):
+        conditions = []
+        params = []
+        # Дата заказа в текущем часовом поясе — как у фильтра createdAt__date
+        tz_name = timezone.get_current_timezone_name()
+        if date_from:
+            conditions.append('(o."createdAt" AT TIME ZONE %s)::date >= %s')
+            params.extend([tz_name, date_from])
+        if date_to:
+            conditions.append('(o."createdAt" AT TIME ZONE %s)::date <= %s')
+            params.extend([tz_name, date_to])
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        sql = (
+            'SELECT s."orderStatusName", o."paymentType", '
+            'GROUPING(s."orderStatusName") AS by_payment, COUNT(*) AS cnt '
+            'FROM "order" o '
+            'LEFT JOIN "orderStatus" s ON s."orderStatusId" = o."orderStatusId"'
+            + where +
+            ' GROUP BY GROUPING SETS ((s."orderStatusName"), (o."paymentType"))'
+            ' ORDER BY cnt DESC'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
 
-            response = HttpResponse(
-                output.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-            return response
+        by_status = []
+        by_payment = []
+        for status_name, payment_type, by_payment_flag, count in rows:
+            if by_payment_flag:
+                by_payment.append({'payment_type': payment_type, 'count': count})
+            else:
+                by_status.append({'status': status_name or 'Неизвестно', 'count': count})
+        return by_status, by_payment
 
-        output = io.StringIO()
-        if rows:
-            fieldnames = list(rows[0].keys())
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
 
-        response = HttpResponse(
-            output.getvalue().encode('utf-8-sig'),
-            content_type='text/csv; charset=utf-8-sig'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-        return response
+# Верхняя граница параметра limit в списках аналитики
+ANALYTICS_MAX_LIMIT = 500
 
 
 class AdminAnalyticsProductsView(APIView):
     """Аналитика популярности товаров."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
 
     def get(self, request):
-        user = request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=status.HTTP_403_FORBIDDEN)
-
         # Получаем параметры фильтрации
         date_from = request.query_params.get('date_from')
         date_to = request.query_params.get('date_to')
-        limit = int(request.query_params.get('limit', 20))
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, ANALYTICS_MAX_LIMIT))
         export_format = request.query_params.get('export')  # csv, excel
 
-        # Базовый queryset - только оплаченные заказы
-        orders_qs = Order.objects.filter(paymentStatus=Order.PAYMENT_STATUS_PAID)
+        # Базовый queryset - только оплаченные заказы за период
+        orders_qs = _paid_orders(_parse_date(date_from), _parse_date(date_to))
 
-        # Применяем фильтры по дате
-        if date_from:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d')
-                orders_qs = orders_qs.filter(createdAt__date__gte=date_from_parsed)
-            except ValueError:
-                pass
-        if date_to:
-            try:
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d')
-                orders_qs = orders_qs.filter(createdAt__date__lte=date_to_parsed)
-            except ValueError:
-                pass
+        # Экспорт в файл если указан формат
+        if export_format in ['csv', 'excel']:
+            filename = f"products_report_{date_from or 'all'}_{date_to or 'all'}"
+            return _export_response(PRODUCTS_EXPORT_HEADERS, _products_export_rows(orders_qs), export_format, filename)
 
-        # Топ продаваемых товаров — из SQL-представления v_popular_products
+        # Все списки дашборда — одним запросом: каждый подзапрос собирает
+        # свой список в JSON-массив, psycopg2 разбирает их в списки словарей
         with connection.cursor() as cursor:
             cursor.execute(
-                'SELECT "productId", "productName", "categoryName", "totalSold", "totalRevenue", "avgRating" '
-                'FROM v_popular_products LIMIT %s',
-                [limit]
+                'WITH ranked AS ('
+                'SELECT "productId", "productName", "categoryName", "totalSold", "totalRevenue", '
+                'ROW_NUMBER() OVER (ORDER BY "totalSold" DESC) AS "soldRank", '
+                'ROW_NUMBER() OVER (ORDER BY "totalRevenue" DESC) AS "revenueRank" '
+                'FROM v_popular_products'
+                ') SELECT '
+                '(SELECT COALESCE(json_agg(r ORDER BY r."soldRank"), \'[]\'::json) '
+                'FROM ranked r WHERE r."soldRank" <= %s), '
+                '(SELECT COALESCE(json_agg(r ORDER BY r."revenueRank"), \'[]\'::json) '
+                'FROM ranked r WHERE r."revenueRank" <= %s), '
+                '(SELECT COALESCE(json_agg(c ORDER BY c."avgRating" DESC, c."reviewCount" DESC), \'[]\'::json) '
+                'FROM (SELECT "productId", "productName", "categoryName", "avgRating", "reviewCount" '
+                'FROM v_product_catalog WHERE "reviewCount" > 0 '
+                'ORDER BY "avgRating" DESC, "reviewCount" DESC LIMIT %s) c), '
+                '(SELECT COALESCE(json_agg(l ORDER BY l."quantity"), \'[]\'::json) '
+                'FROM (SELECT p."productId", p."productName", cat."categoryName", p."quantity", p."price" '
+                'FROM "product" p LEFT JOIN "category" cat ON cat."categoryId" = p."categoryId" '
+                'WHERE p."quantity" < 5 ORDER BY p."quantity" LIMIT 20) l)',
+                [limit, limit, limit]
             )
-            popular_rows = cursor.fetchall()
+            sold_rows, revenue_rows, rated_rows, low_stock_rows = cursor.fetchone()
 
         top_products = [
             {
-                'product_id': row[0],
-                'product_name': row[1],
-                'category_name': row[2],
+                'product_id': row['productId'],
+                'product_name': row['productName'],
+                'category_name': row['categoryName'],
                 'brand_name': '',
-                'total_sold': row[3],
-                'revenue': float(row[4]) if row[4] else 0,
+                'total_sold': row['totalSold'],
+                'revenue': row['totalRevenue'] or 0,
                 'orders_count': 0,
             }
-            for row in popular_rows
+            for row in sold_rows
         ]
 
-        # Товары с наибольшей выручкой — из того же представления, отсортированы по выручке
-        with connection.cursor() as cursor:
-            cursor.execute(
-                'SELECT "productId", "productName", "categoryName", "totalSold", "totalRevenue" '
-                'FROM v_popular_products ORDER BY "totalRevenue" DESC LIMIT %s',
-                [limit]
-            )
-            revenue_rows = cursor.fetchall()
-
         top_revenue_products = [
             {
-                'product_id': row[0],
-                'product_name': row[1],
-                'category_name': row[2],
-                'total_sold': row[3],
-                'revenue': float(row[4]) if row[4] else 0,
+                'product_id': row['productId'],
+                'product_name': row['productName'],
+                'category_name': row['categoryName'],
+                'total_sold': row['totalSold'],
+                'revenue': row['totalRevenue'] or 0,
             }
             for row in revenue_rows
         ]
 
-        # Товары с наивысшим рейтингом — из SQL-представления v_product_catalog
-        with connection.cursor() as cursor:
-            cursor.execute(
-                'SELECT "productId", "productName", "categoryName", "avgRating", "reviewCount" '
-                'FROM v_product_catalog WHERE "reviewCount" > 0 '
-                'ORDER BY "avgRating" DESC, "reviewCount" DESC LIMIT %s',
-                [limit]
-            )
-            rated_rows = cursor.fetchall()
-
         top_rated_list = [
             {
-                'product_id': row[0],
-                'product_name': row[1],
-                'category': row[2],
-                'avg_rating': float(row[3]) if row[3] else 0,
-                'reviews_count': row[4],
+                'product_id': row['productId'],
+                'product_name': row['productName'],
+                'category': row['categoryName'],
+                'avg_rating': float(row['avgRating'] or 0),
+                'reviews_count': row['reviewCount'],
             }
             for row in rated_rows
         ]
 
         # Товары с низким остатком (менее 5 штук)
-        low_stock_products = Product.objects.filter(
-            quantity__lt=5
-        ).order_by('quantity')[:20]
-
         low_stock_list = [
             {
-                'product_id': p.productId,
-                'product_name': p.productName,
-                'category': p.categoryId.categoryName if p.categoryId else None,
-                'quantity': p.quantity,
-                'price': float(p.price),
+                'product_id': row['productId'],
+                'product_name': row['productName'],
+                'category': row['categoryName'],
+                'quantity': row['quantity'],
+                'price': float(row['price']),
             }
-            for p in low_stock_products
+            for row in low_stock_rows
         ]
 
-        # Экспорт в файл если указан формат
-        if export_format in ['csv', 'excel']:
-            products_data = OrderItem.objects.filter(
-                orderId__in=orders_qs
-            ).values(
-                product_name=F('productId__productName'),
-                category_name=F('productId__categoryId__categoryName'),
-                brand_name=F('productId__brandId__brandName'),
-            ).annotate(
-                total_sold=Sum('quantity'),
-                revenue=Sum(F('quantity') * F('unitPrice')),
-                orders_count=Count('orderId', distinct=True)
-            ).order_by('-total_sold')
-
-            rows = [
-                {
-                    'Товар': item['product_name'],
-                    'Категория': item['category_name'] or 'Без категории',
-                    'Бренд': item['brand_name'] or 'Без бренда',
-                    'Продано (шт.)': item['total_sold'],
-                    'Выручка (₽)': float(item['revenue'] or 0),
-                    'Заказов': item['orders_count'],
-                }
-                for item in products_data
-            ]
-
-            filename = f"products_report_{date_from or 'all'}_{date_to or 'all'}"
-            return self._create_export_response(rows, export_format, filename)
-
         return Response({
             'top_selling_products': [
                 {
@@ -1712,74 +1718,12 @@ class AdminAnalyticsProductsView(APIView):
             'low_stock_products': low_stock_list,
         })
 
-    def _create_export_response(self, rows, export_format, filename):
-        """Создаёт HTTP response с файлом для экспорта."""
-        if not rows:
-            rows = [{'Нет данных': ''}]
-
-        if export_format == 'excel' and OPENPYXL_AVAILABLE:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Отчёт"
-
-            headers = list(rows[0].keys())
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="DC2626", end_color="DC2626", fill_type="solid")
-            thin_border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
-
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = thin_border
-
-            for row_idx, row_data in enumerate(rows, 2):
-                for col_idx, header in enumerate(headers, 1):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=row_data[header])
-                    cell.border = thin_border
-
-            for col_idx, header in enumerate(headers, 1):
-                max_length = max(len(str(header)), max(len(str(row[header])) for row in rows))
-                ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = max_length + 2
-
-            output = io.BytesIO()
-            wb.save(output)
-            output.seek(0)
-
-            response = HttpResponse(
-                output.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-            return response
-
-        output = io.StringIO()
-        if rows:
-            fieldnames = list(rows[0].keys())
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-
-        response = HttpResponse(
-            output.getvalue().encode('utf-8-sig'),
-            content_type='text/csv; charset=utf-8-sig'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-        return response
-
 
 class AdminPriceAdjustmentView(APIView):
     """Пакетное изменение цен по категории через хранимую процедуру sp_adjust_prices_by_category."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
 
     def post(self, request):
-        user = request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=status.HTTP_403_FORBIDDEN)
-
         category_id = request.data.get('categoryId')
         percent_change = request.data.get('percentChange')
 
@@ -1799,7 +1743,7 @@ class AdminPriceAdjustmentView(APIView):
             )
 
         try:
-            set_audit_user(user)  # для триггеров аудита на product
+            set_audit_user(request.user)  # для триггеров аудита на product
             with connection.cursor() as cursor:
                 cursor.execute(
                     'CALL sp_adjust_prices_by_category(%s, %s)',
@@ -1822,67 +1766,43 @@ class AdminPriceAdjustmentView(APIView):
 
 class AdminUserActivityView(APIView):
     """Активность пользователей из SQL-представления v_user_activity."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
 
     def get(self, request):
-        user = request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=status.HTTP_403_FORBIDDEN)
-
         with connection.cursor() as cursor:
             cursor.execute(
                 'SELECT "userId", "fullName", "email", "roleName", "orderCount", '
                 '"totalSpent", "reviewCount", "registeredAt" '
                 'FROM v_user_activity ORDER BY "totalSpent" DESC LIMIT 50'
             )
-            rows = cursor.fetchall()
-
-        data = [
-            {
-                'userId': row[0],
-                'fullName': row[1],
-                'email': row[2],
-                'role': row[3],
-                'orderCount': row[4],
-                'totalSpent': float(row[5]) if row[5] else 0,
-                'reviewCount': row[6],
-                'registeredAt': row[7].isoformat() if row[7] else None,
-            }
-            for row in rows
-        ]
+            # Словари строим прямо по курсору, без промежуточного списка кортежей
+            data = [
+                {
+                    'userId': row[0],
+                    'fullName': row[1],
+                    'email': row[2],
+                    'role': row[3],
+                    'orderCount': row[4],
+                    'totalSpent': float(row[5]) if row[5] else 0,
+                    'reviewCount': row[6],
+                    'registeredAt': row[7].isoformat() if row[7] else None,
+                }
+                for row in cursor
+            ]
         return Response(data)
 
 
 class AdminAnalyticsExportView(APIView):
     """Экспорт отчётов в CSV и Excel."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
 
     def get(self, request):
-        logger.info("AdminAnalyticsExportView.get() called")
-        user = request.user
-        if user.roleId.roleName not in ['Администратор', 'Менеджер']:
-            return Response({'detail': 'Доступ запрещён.'}, status=status.HTTP_403_FORBIDDEN)
-
         report_type = request.query_params.get('report', 'sales')  
         export_format = request.query_params.get('format', 'csv')  
         date_from = request.query_params.get('date_from')
         date_to = request.query_params.get('date_to')
 
-        # Базовый queryset
-        orders_qs = Order.objects.filter(paymentStatus=Order.PAYMENT_STATUS_PAID)
-
-        if date_from:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d')
-                orders_qs = orders_qs.filter(createdAt__date__gte=date_from_parsed)
-            except ValueError:
-                pass
-        if date_to:
-            try:
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d')
-                orders_qs = orders_qs.filter(createdAt__date__lte=date_to_parsed)
-            except ValueError:
-                pass
+        orders_qs = _paid_orders(_parse_date(date_from), _parse_date(date_to))
 
         if report_type == 'products':
             return self._export_products_report(orders_qs, export_format, date_from, date_to)
@@ -1891,156 +1811,13 @@ class AdminAnalyticsExportView(APIView):
 
     def _export_sales_report(self, orders_qs, export_format, date_from, date_to):
         """Экспорт отчёта о продажах."""
-        # Данные по дням
-        sales_data = orders_qs.annotate(
-            date=TruncDate('createdAt')
-        ).values('date').annotate(
-            revenue=Sum('total'),
-            orders_count=Count('orderId'),
-            avg_check=Avg('total')
-        ).order_by('date')
-
-        rows = [
-            {
-                'Дата': item['date'].strftime('%Y-%m-%d') if item['date'] else '',
-                'Выручка (₽)': float(item['revenue'] or 0),
-                'Количество заказов': item['orders_count'],
-                'Средний чек (₽)': round(float(item['avg_check'] or 0), 2),
-            }
-            for item in sales_data
-        ]
-
-        # Добавляем итоговую строку
-        total = orders_qs.aggregate(
-            total_revenue=Sum('total'),
-            total_orders=Count('orderId'),
-            avg_check=Avg('total')
-        )
-        rows.append({
-            'Дата': 'ИТОГО',
-            'Выручка (₽)': float(total['total_revenue'] or 0),
-            'Количество заказов': total['total_orders'] or 0,
-            'Средний чек (₽)': round(float(total['avg_check'] or 0), 2),
-        })
-
         filename = f"sales_report_{date_from or 'all'}_{date_to or 'all'}"
-        return self._create_response(rows, export_format, filename)
+        return _export_response(SALES_EXPORT_HEADERS, _sales_export_rows(orders_qs), export_format, filename)
 
     def _export_products_report(self, orders_qs, export_format, date_from, date_to):
         """Экспорт отчёта о популярности товаров."""
-        products_data = OrderItem.objects.filter(
-            orderId__in=orders_qs
-        ).values(
-            product_name=F('productId__productName'),
-            category_name=F('productId__categoryId__categoryName'),
-            brand_name=F('productId__brandId__brandName'),
-        ).annotate(
-            total_sold=Sum('quantity'),
-            revenue=Sum(F('quantity') * F('unitPrice')),
-            orders_count=Count('orderId', distinct=True)
-        ).order_by('-total_sold')
-
-        rows = [
-            {
-                'Товар': item['product_name'],
-                'Категория': item['category_name'] or 'Без категории',
-                'Бренд': item['brand_name'] or 'Без бренда',
-                'Продано (шт.)': item['total_sold'],
-                'Выручка (₽)': float(item['revenue'] or 0),
-                'Заказов': item['orders_count'],
-            }
-            for item in products_data
-        ]
-
         filename = f"products_report_{date_from or 'all'}_{date_to or 'all'}"
-        return self._create_response(rows, export_format, filename)
-
-    def _create_response(self, rows, export_format, filename):
-        """Создаёт HTTP response с файлом."""
-        if not rows:
-            rows = [{'Нет данных': ''}]
-
-        if export_format == 'excel':
-            return self._create_excel_response(rows, filename)
-        else:
-            return self._create_csv_response(rows, filename)
-
-    def _create_csv_response(self, rows, filename):
-        """Создаёт CSV файл."""
-        output = io.StringIO()
-        if rows:
-            fieldnames = list(rows[0].keys())
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-
-        response = HttpResponse(
-            output.getvalue().encode('utf-8-sig'),  # BOM для корректного отображения в Excel
-            content_type='text/csv; charset=utf-8-sig'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-        return response
-
-    def _create_excel_response(self, rows, filename):
-        """Создаёт Excel файл (XLSX) используя openpyxl."""
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Отчёт"
-
-            if rows:
-                # Заголовки
-                headers = list(rows[0].keys())
-                header_font = Font(bold=True, color="FFFFFF")
-                header_fill = PatternFill(start_color="DC2626", end_color="DC2626", fill_type="solid")
-                thin_border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-
-                for col_idx, header in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_idx, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = Alignment(horizontal='center')
-                    cell.border = thin_border
-
-                # Данные
-                for row_idx, row_data in enumerate(rows, 2):
-                    for col_idx, header in enumerate(headers, 1):
-                        cell = ws.cell(row=row_idx, column=col_idx, value=row_data[header])
-                        cell.border = thin_border
-                        if isinstance(row_data[header], (int, float)):
-                            cell.alignment = Alignment(horizontal='right')
-
-                # Автоширина колонок
-                for col_idx, header in enumerate(headers, 1):
-                    max_length = len(str(header))
-                    for row_data in rows:
-                        cell_length = len(str(row_data[header]))
-                        if cell_length > max_length:
-                            max_length = cell_length
-                    ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = max_length + 2
-
-            output = io.BytesIO()
-            wb.save(output)
-            output.seek(0)
-
-            response = HttpResponse(
-                output.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-            return response
-
-        except ImportError:
-            # Если openpyxl не установлен, возвращаем CSV
-            return self._create_csv_response(rows, filename)
+        return _export_response(PRODUCTS_EXPORT_HEADERS, _products_export_rows(orders_qs), export_format, filename)
 
 
 EXPORT_TABLE_CONFIG = {
@@ -2088,6 +1865,21 @@ EXPORT_TABLE_CONFIG = {
     },
 }
 
+# До этого размера выгрузка COPY держится в памяти, дальше — во временном файле
+DATA_EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+
+# Сколько INSERT-ов SQL-выгрузки собирается в один кусок потокового ответа
+SQL_DUMP_CHUNK_ROWS = 500
+
+# Таблицы больше этого числа строк выгружаются фоновой задачей (если есть воркер)
+EXPORT_ASYNC_MIN_ROWS = 50_000
+
+# Размер пачки строк при импорте (один INSERT на пачку)
+IMPORT_BATCH_SIZE = 1000
+
+# Максимальный размер загружаемого CSV
+MAX_IMPORT_BYTES = 50 * 1024 * 1024
+
 IMPORT_TABLE_CONFIG = {
     'product': {
         'model': Product,
@@ -2124,9 +1916,30 @@ IMPORT_TABLE_CONFIG = {
 }
 
 
+# Строковый литерал SQL с экранированием кавычек
+def _sql_quote(text):
+    return "'" + text.replace("'", "''") + "'"
+
+
+# Форматтер значения колонки для SQL-дампа. Тип колонки известен заранее,
+# поэтому форматтер выбирается один раз на колонку, а не на каждое значение
+def _sql_value_formatter(field):
+    if field.is_relation:
+        field = field.target_field
+    if isinstance(field, (models.IntegerField, models.DecimalField, models.FloatField, models.BooleanField)):
+        fmt = str
+    elif isinstance(field, models.DateTimeField):
+        fmt = lambda v: f"'{v.strftime('%Y-%m-%d %H:%M:%S')}'"
+    elif isinstance(field, models.DateField):
+        fmt = lambda v: f"'{v.isoformat()}'"
+    else:
+        fmt = lambda v: _sql_quote(str(v))  # строки и JSON, выбранный как текст
+    return lambda v: 'NULL' if v is None else fmt(v)
+
+
 class AdminDataExportView(APIView):
     """Экспорт данных таблиц в CSV или SQL формат."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
 
     def perform_content_negotiation(self, request, force=False):
         """Возвращает файл (HttpResponse), а не DRF Response — пропускаем строгую проверку."""
@@ -2134,10 +1947,6 @@ class AdminDataExportView(APIView):
         return (JSONRenderer(), JSONRenderer.media_type)
 
     def get(self, request):
-        user = request.user
-        if not hasattr(user, 'roleId') or user.roleId.roleName != 'Администратор':
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
-
         table = request.query_params.get('table', '')
         fmt = request.query_params.get('file_format', 'csv')
 
@@ -2150,77 +1959,189 @@ class AdminDataExportView(APIView):
         headers = config['headers']
         db_table = config['db_table']
 
-        queryset = model.objects.all().order_by(model._meta.pk.name)
-        rows = queryset.values_list(*fields)
+        # Большую таблицу выгружает воркер Celery, чтобы запрос не упёрся
+        # в таймаут; файл забирается через AdminDataExportJobView
+        if not celery_app.conf.task_always_eager and model.objects.count() > EXPORT_ASYNC_MIN_ROWS:
+            result = export_table_task.delay(table, fmt)
+            return Response({
+                'detail': 'Выгрузка большой таблицы запущена в фоне.',
+                'task_id': result.id,
+            }, status=status.HTTP_202_ACCEPTED)
 
         if fmt == 'sql':
-            output = io.StringIO()
-            output.write(f'-- Экспорт таблицы {db_table}\n')
-            output.write(f'-- Дата: {timezone.now().strftime("%Y-%m-%d %H:%M:%S")}\n')
-            output.write(f'-- Записей: {len(rows)}\n\n')
-
-            for row in rows:
-                values = []
-                for val in row:
-                    if val is None:
-                        values.append('NULL')
-                    elif isinstance(val, (int, float, Decimal)):
-                        values.append(str(val))
-                    elif isinstance(val, (dict, list)):
-                        s = _json.dumps(val, ensure_ascii=False).replace("'", "''")
-                        values.append(f"'{s}'")
-                    elif isinstance(val, datetime):
-                        values.append(f"'{val.strftime('%Y-%m-%d %H:%M:%S')}'")
-                    elif hasattr(val, 'isoformat'):
-                        values.append(f"'{val.isoformat()}'")
-                    else:
-                        s = str(val).replace("'", "''")
-                        values.append(f"'{s}'")
-
-                cols = ', '.join(f'"{h}"' for h in headers)
-                vals = ', '.join(values)
-                output.write(f'INSERT INTO {db_table} ({cols}) VALUES ({vals});\n')
-
-            response = HttpResponse(output.getvalue(), content_type='text/sql; charset=utf-8')
+            response = StreamingHttpResponse(
+                self._sql_dump(model, fields, headers, db_table),
+                content_type='text/sql; charset=utf-8'
+            )
             response['Content-Disposition'] = f'attachment; filename="{table}_export.sql"'
             return response
+        else:
+            return self._copy_csv_response(table, model, fields, headers, db_table)
 
+    # Запись выгрузки в файл (для фоновой задачи export_table_task)
+    def write_export(self, table, fmt, fileobj):
+        config = EXPORT_TABLE_CONFIG[table]
+        model = config['model']
+        fields = config['fields']
+        headers = config['headers']
+        db_table = config['db_table']
+
+        if fmt == 'sql':
+            for chunk in self._sql_dump(model, fields, headers, db_table):
+                fileobj.write(chunk.encode('utf-8'))
+        elif connection.vendor == 'postgresql':
+            self._copy_csv(fileobj, model, fields, headers, db_table)
         else:
-            output = io.StringIO()
-            writer = csv.writer(output, quoting=csv.QUOTE_ALL)
-            writer.writerow(headers)
-            for row in rows:
-                processed = []
-                for val in row:
-                    if val is None:
-                        processed.append('')
-                    elif isinstance(val, (dict, list)):
-                        processed.append(_json.dumps(val, ensure_ascii=False))
-                    else:
-                        processed.append(str(val))
-                writer.writerow(processed)
-
-            response = HttpResponse(output.getvalue(), content_type='text/csv; charset=utf-8-sig')
-            response['Content-Disposition'] = f'attachment; filename="{table}_export.csv"'
-            return response
+            for chunk in _csv_chunks(headers, self._csv_rows(model, fields), quoting=csv.QUOTE_ALL):
+                fileobj.write(chunk)
+
+    # SQL-дамп отдаётся построчно: строки читаются серверным курсором,
+    # число записей известно только в конце и пишется последней строкой
+    def _sql_dump(self, model, fields, headers, db_table):
+        yield f'-- Экспорт таблицы {db_table}\n'
+        yield f'-- Дата: {timezone.now().strftime("%Y-%m-%d %H:%M:%S")}\n\n'
+
+        model_fields = {f.attname: f for f in model._meta.concrete_fields}
+        formatters = [_sql_value_formatter(model_fields[name]) for name in fields]
+
+        # JSON-колонки PostgreSQL отдаёт сразу текстом: без json.loads
+        # при чтении и json.dumps при записи каждой строки
+        columns = []
+        json_as_text = {}
+        for name in fields:
+            if isinstance(model_fields[name], models.JSONField):
+                json_as_text[f'{name}_text'] = Cast(name, models.TextField())
+                columns.append(f'{name}_text')
+            else:
+                columns.append(name)
+
+        cols = ', '.join(f'"{h}"' for h in headers)
+        insert_prefix = f'INSERT INTO {db_table} ({cols}) VALUES ('
+
+        # Префикс INSERT собран один раз; строки отдаются пачками, а не
+        # отдельным куском ответа на каждую строку
+        count = 0
+        chunk = []
+        queryset = model.objects.annotate(**json_as_text).order_by(model._meta.pk.name).values_list(*columns)
+        for row in queryset.iterator(chunk_size=2000):
+            chunk.append(insert_prefix)
+            chunk.append(', '.join([fmt(val) for fmt, val in zip(formatters, row)]))
+            chunk.append(');\n')
+            count += 1
+            if len(chunk) >= SQL_DUMP_CHUNK_ROWS * 3:
+                yield ''.join(chunk)
+                chunk.clear()
+        if chunk:
+            yield ''.join(chunk)
+
+        yield f'\n-- Записей: {count}\n'
+
+    # CSV формирует сам PostgreSQL (COPY ... TO STDOUT): строки не проходят
+    # через Python, а файл копится во временном файле и отдаётся потоком
+    def _copy_csv_response(self, table, model, fields, headers, db_table):
+        if connection.vendor != 'postgresql':
+            return self._csv_response(table, model, fields, headers)
+
+        buffer = tempfile.SpooledTemporaryFile(max_size=DATA_EXPORT_SPOOL_SIZE)
+        self._copy_csv(buffer, model, fields, headers, db_table)
+        buffer.seek(0)
+
+        response = FileResponse(buffer, content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{table}_export.csv"'
+        return response
+
+    @classmethod
+    def _copy_csv(cls, fileobj, model, fields, headers, db_table):
+        columns = {f.attname: f for f in model._meta.concrete_fields}
+        select_list = ', '.join(
+            f'{cls._copy_text_expr(columns[f])} AS "{h}"' for f, h in zip(fields, headers)
+        )
+        copy_sql = (
+            f'COPY (SELECT {select_list} FROM {db_table} ORDER BY "{model._meta.pk.column}") '
+            f'TO STDOUT WITH (FORMAT csv, HEADER, FORCE_QUOTE *)'
+        )
+        fileobj.write(codecs.BOM_UTF8)  # чтобы Excel корректно открыл UTF-8
+        with connection.cursor() as cursor:
+            cursor.copy_expert(copy_sql, fileobj)
+
+    # Значение столбца текстом в том же виде, что и у _csv_rows (str() в Python):
+    # время в UTC с '+00:00' и микросекундами только если они есть, bool как
+    # True/False, NULL — пустая строка в кавычках
+    @staticmethod
+    def _copy_text_expr(field):
+        column = f'"{field.column}"'
+        if isinstance(field, models.DateTimeField):
+            utc = f"({column} AT TIME ZONE 'UTC')"
+            expr = (
+                f"to_char({utc}, 'YYYY-MM-DD HH24:MI:SS') || "
+                f"CASE WHEN to_char({utc}, 'US') = '000000' THEN '' ELSE to_char({utc}, '.US') END || '+00:00'"
+            )
+        elif isinstance(field, models.BooleanField):
+            expr = f"CASE WHEN {column} THEN 'True' ELSE 'False' END"
+        else:
+            expr = f'{column}::text'
+        return f"COALESCE({expr}, '')"
+
+    @staticmethod
+    def _csv_rows(model, fields):
+        queryset = model.objects.order_by(model._meta.pk.name).values_list(*fields)
+        for row in queryset.iterator(chunk_size=2000):
+            yield [
+                '' if val is None
+                else _json.dumps(val, ensure_ascii=False) if isinstance(val, (dict, list))
+                else str(val)
+                for val in row
+            ]
+
+    # Запасной путь без COPY (не PostgreSQL): тот же CSV, построчно из Python
+    def _csv_response(self, table, model, fields, headers):
+        response = StreamingHttpResponse(
+            _csv_chunks(headers, self._csv_rows(model, fields), quoting=csv.QUOTE_ALL),
+            content_type='text/csv; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{table}_export.csv"'
+        return response
+
+
+class AdminDataExportJobView(APIView):
+    """Статус фоновой выгрузки таблицы; готовый файл отдаётся этим же запросом."""
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, task_id):
+        result = AsyncResult(task_id, app=celery_app)
+        if result.failed():
+            return Response({'detail': f'Ошибка экспорта: {result.result}'},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if not result.successful():
+            return Response({'task_id': task_id, 'status': result.state},
+                            status=status.HTTP_202_ACCEPTED)
+
+        # Идентификатор чужой задачи (например, бэкапа) — файла выгрузки нет
+        if not isinstance(result.result, dict) or 'filename' not in result.result:
+            return Response({'detail': 'Выгрузка не найдена.'}, status=status.HTTP_404_NOT_FOUND)
+        filepath = EXPORT_DIR / result.result['filename']
+        if not filepath.exists():
+            return Response({'detail': 'Файл выгрузки не найден.'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(filepath, 'rb'), as_attachment=True, filename=filepath.name)
 
 
 class AdminDataImportView(APIView):
     """Импорт данных из CSV."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request):
-        user = request.user
-        if not hasattr(user, 'roleId') or user.roleId.roleName != 'Администратор':
-            return Response({'detail': 'Доступ запрещён.'}, status=403)
-
         table = request.data.get('table', '')
         csv_file = request.FILES.get('file')
 
         if not csv_file:
             return Response({'detail': 'CSV-файл не предоставлен.'}, status=400)
 
+        if csv_file.size > MAX_IMPORT_BYTES:
+            return Response({
+                'detail': f'Файл слишком большой (максимум {MAX_IMPORT_BYTES // (1024 * 1024)} МБ).'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
         if table not in IMPORT_TABLE_CONFIG:
             return Response({'detail': f'Импорт в таблицу «{table}» не поддерживается.'}, status=400)
 
@@ -2230,8 +2151,9 @@ class AdminDataImportView(APIView):
         required = config['required']
 
         try:
-            content = csv_file.read().decode('utf-8-sig')
-            reader = csv.DictReader(io.StringIO(content))
+            # Файл читается потоком, без копии всего содержимого в памяти
+            text_stream = io.TextIOWrapper(csv_file.file, encoding='utf-8-sig', newline='')
+            reader = csv.DictReader(text_stream)
             csv_headers = reader.fieldnames or []
 
             missing_required = [f for f in required if f not in csv_headers]
@@ -2240,25 +2162,43 @@ class AdminDataImportView(APIView):
                     'detail': f'В CSV отсутствуют обязательные столбцы: {", ".join(missing_required)}'
                 }, status=400)
 
-            created_count = 0
-            errors = []
-
-            for i, row in enumerate(reader, start=2):
-                try:
-                    obj_data = {}
-                    for csv_col, model_field in fields_map.items():
-                        if csv_col in row and row[csv_col].strip() != '':
-                            obj_data[model_field] = row[csv_col].strip()
-
-                    missing_in_row = [f for f in required if f not in row or row[f].strip() == '']
-                    if missing_in_row:
-                        errors.append(f'Строка {i}: пустые обязательные поля: {", ".join(missing_in_row)}')
-                        continue
+            # Пары столбцов и обязательные поля собираются один раз, а не на каждой строке.
+            # Недостающие в строке значения DictReader отдаёт как None
+            field_pairs = tuple(fields_map.items())
+            required_fields = tuple(required)
 
-                    model.objects.create(**obj_data)
-                    created_count += 1
-                except Exception as e:
-                    errors.append(f'Строка {i}: {str(e)}')
+            # Весь импорт — одна транзакция; пачки и построчные повторы
+            # выполняются в точках сохранения внутри неё
+            with transaction.atomic():
+                created_count = 0
+                errors = []
+                pending = []
+
+                for i, row in enumerate(reader, start=2):
+                    try:
+                        obj_data = {
+                            model_field: value
+                            for csv_col, model_field in field_pairs
+                            if (value := (row.get(csv_col) or '').strip())
+                        }
+
+                        missing_in_row = [f for f in required_fields if not (row.get(f) or '').strip()]
+                        if missing_in_row:
+                            errors.append(f'Строка {i}: пустые обязательные поля: {", ".join(missing_in_row)}')
+                            continue
+
+                        pending.append((i, self._build_instance(model, obj_data)))
+                    except DjangoValidationError as e:
+                        errors.append(f'Строка {i}: {"; ".join(e.messages)}')
+                    except Exception as e:
+                        errors.append(f'Строка {i}: {str(e)}')
+
+                    if len(pending) >= IMPORT_BATCH_SIZE:
+                        created_count += self._save_batch(model, pending, errors)
+                        pending = []
+
+                if pending:
+                    created_count += self._save_batch(model, pending, errors)
 
             detail = f'Создано записей: {created_count}.'
             if errors:
@@ -2266,42 +2206,83 @@ class AdminDataImportView(APIView):
 
             return Response({'detail': detail}, status=200 if created_count > 0 else 400)
 
-        except UnicodeDecodeError:
+        except (UnicodeDecodeError, csv.Error):
             return Response({'detail': 'Невозможно прочитать файл. Убедитесь, что он в формате CSV (UTF-8).'}, status=400)
         except Exception as e:
             return Response({'detail': f'Ошибка импорта: {str(e)}'}, status=500)
 
+    # Значения приводятся к типам полей заранее: ошибки конвертации
+    # относятся к своей строке и не срывают вставку всей пачки
+    @staticmethod
+    def _build_instance(model, obj_data):
+        values = {}
+        for name, raw in obj_data.items():
+            field = model._meta.get_field(name)
+            value = field.to_python(raw)
+            field.run_validators(value)
+            values[name] = value
+        return model(**values)
+
+    # Пачка вставляется одним INSERT. Если БД отклонила пачку (внешний ключ,
+    # ограничение), строки сохраняются по одной, чтобы указать виновную строку
+    @staticmethod
+    def _save_batch(model, pending, errors):
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj for _, obj in pending], batch_size=IMPORT_BATCH_SIZE)
+            return len(pending)
+        except DatabaseError:
+            pass
+
+        created = 0
+        for i, obj in pending:
+            obj.pk = None
+            try:
+                with transaction.atomic():
+                    obj.save(force_insert=True)
+                created += 1
+            except Exception as e:
+                errors.append(f'Строка {i}: {str(e)}')
+        return created
+
+
+# Каталог бэкапов разрешается один раз при загрузке модуля
+BACKUP_DIR_RESOLVED = Path(settings.BACKUP_DIR).resolve()
+
+
+# Путь к файлу бэкапа или None, если имя выводит за пределы каталога
+# (защита от path traversal)
+def _backup_file(filename):
+    filepath = (BACKUP_DIR_RESOLVED / filename).resolve()
+    return filepath if filepath.parent == BACKUP_DIR_RESOLVED else None
+
 
 class AdminBackupListView(APIView):
     """Список резервных копий и создание новой."""
-    permission_classes = [IsAuthenticated]
-
-    def _check_admin(self, user):
-        if user.roleId.roleName != 'Администратор':
-            return Response({'detail': 'Доступно только администратору.'}, status=status.HTTP_403_FORBIDDEN)
-        return None
+    permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
         """Список существующих бэкапов."""
-        denied = self._check_admin(request.user)
-        if denied:
-            return denied
-
-        backup_dir = Path(settings.BACKUP_DIR)
+        backup_dir = BACKUP_DIR_RESOLVED
         if not backup_dir.exists():
             return Response({'backups': [], 'backup_dir': str(backup_dir)})
 
+        # DirEntry кэширует результат stat(), а is_file() берёт тип из самого
+        # листинга каталога — один системный вызов stat на файл
+        with os.scandir(backup_dir) as it:
+            entries = [e for e in it if e.name.endswith(('.backup', '.sql')) and e.is_file()]
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+
         backups = []
-        for f in sorted(backup_dir.iterdir(), key=lambda x: x.stat().st_mtime, reverse=True):
-            if f.is_file() and f.suffix in ('.backup', '.sql'):
-                stat = f.stat()
-                backups.append({
-                    'filename': f.name,
-                    'size': stat.st_size,
-                    'sizeHuman': self._human_size(stat.st_size),
-                    'createdAt': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    'format': 'custom' if f.suffix == '.backup' else 'sql',
-                })
+        for entry in entries:
+            stat = entry.stat()
+            backups.append({
+                'filename': entry.name,
+                'size': stat.st_size,
+                'sizeHuman': self._human_size(stat.st_size),
+                'createdAt': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                'format': 'custom' if entry.name.endswith('.backup') else 'sql',
+            })
 
         return Response({
             'backups': backups,
@@ -2311,46 +2292,40 @@ class AdminBackupListView(APIView):
 
     def post(self, request):
         """Создание новой резервной копии."""
-        denied = self._check_admin(request.user)
-        if denied:
-            return denied
-
         fmt = request.data.get('format', 'custom')
         data_only = request.data.get('dataOnly', False)
 
         if fmt not in ('custom', 'sql'):
             return Response({'detail': 'Формат должен быть custom или sql.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            from django.core.management import call_command
-            from io import StringIO
-            out = StringIO()
-            call_command('backup_db', format=fmt, data_only=data_only, stdout=out)
-            output = out.getvalue()
-
-            # Парсим путь к файлу из вывода команды
-            log_audit(request.user, 'CREATE', 'backup', 0,
-                      old_values=None,
-                      new_values={'format': fmt, 'data_only': data_only, 'output': output.strip()})
-
+        result = create_backup_task.delay(request.user.pk, fmt, data_only)
+        # В режиме CELERY_TASK_ALWAYS_EAGER задача уже выполнена — отвечаем сразу
+        if result.ready():
+            if result.failed():
+                logger.error("Ошибка создания бэкапа: %s", result.result)
+                return Response({
+                    'detail': f'Ошибка создания резервной копии: {result.result}'
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             return Response({
                 'detail': 'Резервная копия успешно создана.',
-                'output': output.strip(),
+                'output': result.result['output'],
             }, status=status.HTTP_201_CREATED)
 
-        except Exception as e:
-            logger.exception("Ошибка создания бэкапа")
-            return Response({
-                'detail': f'Ошибка создания резервной копии: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({
+            'detail': 'Создание резервной копии запущено.',
+            'task_id': result.id,
+        }, status=status.HTTP_202_ACCEPTED)
 
-    @staticmethod
-    def _human_size(nbytes):
-        for unit in ('Б', 'КБ', 'МБ', 'ГБ'):
-            if abs(nbytes) < 1024:
-                return f'{nbytes:.1f} {unit}'
-            nbytes /= 1024
-        return f'{nbytes:.1f} ТБ'
+    SIZE_UNITS = ('Б', 'КБ', 'МБ', 'ГБ', 'ТБ')
+
+    @classmethod
+    def _human_size(cls, nbytes):
+        if nbytes <= 0:
+            return f'0.0 {cls.SIZE_UNITS[0]}'
+        # Единица измерения — целая часть log1024, считается по длине
+        # числа в битах без деления в цикле и без погрешности float
+        i = min((int(nbytes).bit_length() - 1) // 10, len(cls.SIZE_UNITS) - 1)
+        return f'{nbytes / 1024 ** i:.1f} {cls.SIZE_UNITS[i]}'
 
 
 class AdminBackupDownloadView(APIView):
@@ -2364,26 +2339,33 @@ class AdminBackupDownloadView(APIView):
             token_key = request.query_params.get('token')
             if token_key:
                 try:
-                    token = Token.objects.get(key=token_key)
+                    token = Token.objects.select_related('user__roleId').get(key=token_key)
                     user = token.user
                 except Token.DoesNotExist:
                     return Response({'detail': 'Недействительный токен.'}, status=status.HTTP_401_UNAUTHORIZED)
             else:
                 return Response({'detail': 'Необходима авторизация.'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        if user.roleId.roleName != 'Администратор':
+        if get_role_name(user) != ROLE_ADMIN:
             return Response({'detail': 'Доступно только администратору.'}, status=status.HTTP_403_FORBIDDEN)
 
-        backup_dir = Path(settings.BACKUP_DIR)
-        filepath = backup_dir / filename
-
-        # Защита от path traversal
-        if not filepath.resolve().parent == backup_dir.resolve():
+        filepath = _backup_file(filename)
+        if filepath is None:
             return Response({'detail': 'Недопустимое имя файла.'}, status=status.HTTP_400_BAD_REQUEST)
 
         if not filepath.exists():
             return Response({'detail': 'Файл не найден.'}, status=status.HTTP_404_NOT_FOUND)
 
+        # За nginx файл отдаёт сам веб-сервер (sendfile), Django — только заголовки
+        accel_prefix = getattr(settings, 'BACKUP_X_ACCEL_PREFIX', '')
+        if accel_prefix:
+            response = HttpResponse(content_type='application/octet-stream')
+            response['X-Accel-Redirect'] = f'{accel_prefix.rstrip("/")}/{quote(filepath.name)}'
+            response['Content-Disposition'] = content_disposition_header(True, filepath.name)
+            return response
+
+        # Иначе FileResponse с настоящим файлом: сервер может использовать
+        # wsgi.file_wrapper
         return FileResponse(
             open(filepath, 'rb'),
             as_attachment=True,
@@ -2393,16 +2375,11 @@ class AdminBackupDownloadView(APIView):
 
 class AdminBackupDeleteView(APIView):
     """Удаление файла бэкапа."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
 
     def delete(self, request, filename):
-        if request.user.roleId.roleName != 'Администратор':
-            return Response({'detail': 'Доступно только администратору.'}, status=status.HTTP_403_FORBIDDEN)
-
-        backup_dir = Path(settings.BACKUP_DIR)
-        filepath = backup_dir / filename
-
-        if not filepath.resolve().parent == backup_dir.resolve():
+        filepath = _backup_file(filename)
+        if filepath is None:
             return Response({'detail': 'Недопустимое имя файла.'}, status=status.HTTP_400_BAD_REQUEST)
 
         if not filepath.exists():
@@ -2416,41 +2393,46 @@ class AdminBackupDeleteView(APIView):
 
 class AdminBackupRestoreView(APIView):
     """Восстановление БД из бэкапа."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdmin]
 
     def post(self, request):
-        if request.user.roleId.roleName != 'Администратор':
-            return Response({'detail': 'Доступно только администратору.'}, status=status.HTTP_403_FORBIDDEN)
-
         filename = request.data.get('filename')
         if not filename:
             return Response({'detail': 'Укажите имя файла (filename).'}, status=status.HTTP_400_BAD_REQUEST)
 
-        backup_dir = Path(settings.BACKUP_DIR)
-        filepath = backup_dir / filename
-
-        if not filepath.resolve().parent == backup_dir.resolve():
+        filepath = _backup_file(filename)
+        if filepath is None:
             return Response({'detail': 'Недопустимое имя файла.'}, status=status.HTTP_400_BAD_REQUEST)
 
         if not filepath.exists():
             return Response({'detail': 'Файл не найден.'}, status=status.HTTP_404_NOT_FOUND)
 
-        try:
-            from django.core.management import call_command
-            from io import StringIO
-            out = StringIO()
-            err = StringIO()
-            call_command('restore_db', str(filepath), no_confirm=True, stdout=out, stderr=err)
-
-            log_audit(request.user, 'UPDATE', 'backup_restore', 0,
-                      old_values=None,
-                      new_values={'filename': filename})
-
+        result = restore_backup_task.delay(request.user.pk, str(filepath))
+        if result.ready():
+            if result.failed():
+                logger.error("Ошибка восстановления БД: %s", result.result)
+                return Response({
+                    'detail': f'Ошибка восстановления: {result.result}'
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             return Response({
                 'detail': f'База данных восстановлена из «{filename}».',
             })
-        except Exception as e:
-            logger.exception("Ошибка восстановления БД")
-            return Response({
-                'detail': f'Ошибка восстановления: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({
+            'detail': f'Восстановление из «{filename}» запущено.',
+            'task_id': result.id,
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class AdminBackupTaskView(APIView):
+    """Статус фоновой задачи создания или восстановления бэкапа."""
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, task_id):
+        result = AsyncResult(task_id, app=celery_app)
+        data = {'task_id': task_id, 'status': result.state}
+        if result.successful():
+            data['result'] = result.result
+        elif result.failed():
+            data['detail'] = str(result.result)
+        return Response(data)
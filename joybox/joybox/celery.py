@@ -0,0 +1,11 @@
+# Приложение Celery для фоновых задач (бэкапы, восстановление БД).
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'joybox.settings')
+
+app = Celery('joybox')
+# Настройки берутся из settings.py с префиксом CELERY_
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
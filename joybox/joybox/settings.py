@@ -51,6 +51,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.AuditLogMiddleware',
 ]
 
 ROOT_URLCONF = 'joybox.urls'
@@ -75,13 +76,13 @@ WSGI_APPLICATION = 'joybox.wsgi.application'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.TokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -163,4 +164,15 @@ TEST_RUNNER = 'core.test_runner.JoyBoxTestRunner'
 # Резервное копирование БД
 BACKUP_DIR = BASE_DIR / config('BACKUP_DIR', default='backups')
 BACKUP_MAX_COUNT = config('BACKUP_MAX_COUNT', default=10, cast=int)
-PG_BIN_PATH = config('PG_BIN_PATH', default='')
\ No newline at end of file
+PG_BIN_PATH = config('PG_BIN_PATH', default='')
+# Если задан, скачивание бэкапов отдаёт nginx (X-Accel-Redirect) по этому
+# internal-пути, например /protected/backups/ с alias на BACKUP_DIR
+BACKUP_X_ACCEL_PREFIX = config('BACKUP_X_ACCEL_PREFIX', default='')
+
+# Фоновые задачи (Celery). При CELERY_TASK_ALWAYS_EAGER=True задачи
+# выполняются сразу в процессе запроса — воркер и брокер не нужны
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://127.0.0.1:6379/0')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://127.0.0.1:6379/0')
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=True, cast=bool)
+CELERY_TASK_TRACK_STARTED = True
+CELERY_RESULT_EXPIRES = 24 * 60 * 60
@@ -34,29 +34,144 @@ JoyBox — Нагрузочное тестирование (Locust + Faker)
 # locust -f locustfile.py --host=http://127.0.0.1:8000
 # http://localhost:8089
 
+# Пользователи наследуют FastHttpUser (клиент geventhttpclient): он в разы
+# дешевле HttpUser на python-requests и держит keep-alive соединения, поэтому
+# один процесс Locust создаёт заметно большую нагрузку
+
+# Файл совместим с PyPy — при упоре в CPU генератора нагрузки:
+# pypy3 -m locust -f locustfile.py --host=http://127.0.0.1:8000
+# Под PyPy используется стандартный json (JIT), под CPython — orjson
+
 
-import random
 import json
-from locust import HttpUser, task, between, tag, events
+import platform
+import random
+import uuid
+import gevent
+import requests
+from locust import FastHttpUser, task, between, tag, events
 from faker import Faker
 
 fake = Faker('ru_RU')
 
+
+def _stdlib_json_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False).encode()
+
+
+# orjson — C-расширение: под PyPy оно работает через медленную прослойку cpyext
+_json_loads = json.loads
+_json_dumps = _stdlib_json_dumps
+if platform.python_implementation() == 'CPython':
+    try:
+        import orjson
+        _json_loads = orjson.loads
+        _json_dumps = orjson.dumps
+    except ImportError:
+        pass
+
+# Пулы id каталога для random.choice. Заполняются один раз при старте теста
+# (_seed_catalog_ids), а не по ходу просмотра каталога гостями
 _product_ids = []
 _category_ids = []
 _brand_ids = []
 
 
+# Заготовленные Faker-данные: генерируются один раз при старте теста
+# (_fill_fake_pools), в задачах значения только выбираются random.choice
+_FAKE_POOL_SIZE = 1000
+_NAMES = []
+_BIRTH_DATES = []
+_ADDRESSES = []
+_WORDS = []
+_SENTENCES = []
+_PARAGRAPHS = []
+_COMPANIES = []
+_COUNTRIES = []
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Неизменяемые варианты значений для задач — собираются один раз
+_ORDERING = ('price', '-price', 'productName')
+_SEARCH_TERMS = ('кукла', 'машина', 'конструктор', 'мяч', 'игра', 'набор', 'робот')
+_DELIVERY_TYPES = ('самовывоз', 'курьером')
+_PAYMENT_TYPES = ('онлайн', 'наличными при получении')
+_AGE_RATINGS = (0, 3, 6, 12)
+
+# Адреса с id: готовые шаблоны str.format, поисковые запросы — целиком
+_PRODUCT_URL = '/api/catalog/products/{}/'.format
+_PRODUCT_REVIEWS_URL = '/api/catalog/products/{}/reviews/'.format
+_CART_ITEM_URL = '/api/auth/cart/{}/'.format
+_SEARCH_URLS = tuple(f'/api/catalog/products/?search={term}' for term in _SEARCH_TERMS)
+
+
 def _safe_json(response):
     """Безопасный парсинг JSON из ответа."""
     try:
-        return response.json()
+        return _json_loads(response.content)
     except Exception:
         return None
 
+
+def _unique_email():
+    """Уникальный email без реестра fake.unique, который растёт весь тест."""
+    return f'load-{uuid.uuid4().hex[:16]}@example.com'
+
+
+def _auth_headers(token):
+    """Заголовки авторизации — собираются один раз после входа."""
+    return {'Authorization': f'Token {token}'} if token else {}
+
+
+def _post_json(client, url, payload, headers=None, **kwargs):
+    """POST с JSON-телом (orjson под CPython)."""
+    headers = {**headers, **_JSON_HEADERS} if headers else _JSON_HEADERS
+    return client.post(url, data=_json_dumps(payload), headers=headers, **kwargs)
+
+
+@events.test_start.add_listener
+def _seed_catalog_ids(environment, **kwargs):
+    """Один раз перед тестом загружает id товаров, категорий и брендов."""
+    host = (environment.host or '').rstrip('/')
+    if not host:
+        return
+    with requests.Session() as session:
+        for path, ids, field in (
+            ('/api/catalog/products/', _product_ids, 'productId'),
+            ('/api/catalog/categories/', _category_ids, 'categoryId'),
+            ('/api/catalog/brands/', _brand_ids, 'brandId'),
+        ):
+            try:
+                data = _json_loads(session.get(host + path, timeout=10).content)
+            except Exception:
+                continue
+            if isinstance(data, list):
+                ids[:] = [item[field] for item in data if item.get(field)]
+
+
+@events.test_start.add_listener
+def _fill_fake_pools(environment, **kwargs):
+    """Один раз перед тестом генерирует пулы имён, адресов и текстов."""
+    if _NAMES:
+        return
+    size = _FAKE_POOL_SIZE
+    _NAMES.extend((fake.first_name(), fake.last_name()) for _ in range(size))
+    _BIRTH_DATES.extend(
+        fake.date_of_birth(minimum_age=18, maximum_age=60).isoformat() for _ in range(size)
+    )
+    _ADDRESSES.extend(
+        (fake.city(), fake.street_name(), fake.postcode()[:6]) for _ in range(size)
+    )
+    _WORDS.extend(fake.word() for _ in range(size))
+    _SENTENCES.extend(fake.sentence(nb_words=10) for _ in range(size))
+    _PARAGRAPHS.extend(fake.paragraph(nb_sentences=3) for _ in range(size))
+    _COMPANIES.extend(fake.company()[:30] for _ in range(size))
+    _COUNTRIES.extend(fake.country()[:50] for _ in range(size))
+
+
 #  1. ГОСТЬ — только чтение каталога
 
-class GuestUser(HttpUser):
+class GuestUser(FastHttpUser):
     """
     Неавторизованный посетитель магазина.
     Вес 5 — самый частый тип пользователя.
@@ -64,23 +179,17 @@ class GuestUser(HttpUser):
     """
     weight = 5
     wait_time = between(1, 5)
+    network_timeout = 30.0
+    connection_timeout = 5.0
+    # Одно-два keep-alive соединения на пользователя, как у браузера (по умолчанию 10)
+    concurrency = 1
+    max_retries = 0
 
     @tag('catalog')
     @task(5)
     def browse_products(self):
         """Просмотр списка товаров."""
-        with self.client.get('/api/catalog/products/', name='GET /catalog/products',
-                             catch_response=True) as resp:
-            if resp.status_code == 200:
-                data = _safe_json(resp)
-                if data and isinstance(data, list):
-                    for p in data[:20]:
-                        pid = p.get('productId')
-                        if pid and pid not in _product_ids:
-                            _product_ids.append(pid)
-                resp.success()
-            else:
-                resp.failure(f'Status {resp.status_code}')
+        self.client.get('/api/catalog/products/', name='GET /catalog/products')
 
     @tag('catalog')
     @task(3)
@@ -93,7 +202,7 @@ class GuestUser(HttpUser):
             params['min_price'] = random.randint(100, 500)
             params['max_price'] = random.randint(1000, 5000)
         if random.random() > 0.5:
-            params['ordering'] = random.choice(['price', '-price', 'productName'])
+            params['ordering'] = random.choice(_ORDERING)
         self.client.get('/api/catalog/products/', params=params,
                         name='GET /catalog/products?filters')
 
@@ -101,8 +210,7 @@ class GuestUser(HttpUser):
     @task(3)
     def search_products(self):
         """Поиск товаров по названию."""
-        query = random.choice(['кукла', 'машина', 'конструктор', 'мяч', 'игра', 'набор', 'робот'])
-        self.client.get(f'/api/catalog/products/?search={query}',
+        self.client.get(random.choice(_SEARCH_URLS),
                         name='GET /catalog/products?search')
 
     @tag('catalog')
@@ -111,7 +219,7 @@ class GuestUser(HttpUser):
         """Просмотр детальной страницы товара."""
         if _product_ids:
             pid = random.choice(_product_ids)
-            self.client.get(f'/api/catalog/products/{pid}/',
+            self.client.get(_PRODUCT_URL(pid),
                             name='GET /catalog/products/[id]')
 
     @tag('catalog')
@@ -120,42 +228,20 @@ class GuestUser(HttpUser):
         """Просмотр отзывов товара."""
         if _product_ids:
             pid = random.choice(_product_ids)
-            self.client.get(f'/api/catalog/products/{pid}/reviews/',
+            self.client.get(_PRODUCT_REVIEWS_URL(pid),
                             name='GET /catalog/products/[id]/reviews')
 
     @tag('catalog')
     @task(2)
     def browse_categories(self):
         """Просмотр категорий."""
-        with self.client.get('/api/catalog/categories/', name='GET /catalog/categories',
-                             catch_response=True) as resp:
-            if resp.status_code == 200:
-                data = _safe_json(resp)
-                if data and isinstance(data, list):
-                    for c in data:
-                        cid = c.get('categoryId')
-                        if cid and cid not in _category_ids:
-                            _category_ids.append(cid)
-                resp.success()
-            else:
-                resp.failure(f'Status {resp.status_code}')
+        self.client.get('/api/catalog/categories/', name='GET /catalog/categories')
 
     @tag('catalog')
     @task(2)
     def browse_brands(self):
         """Просмотр брендов."""
-        with self.client.get('/api/catalog/brands/', name='GET /catalog/brands',
-                             catch_response=True) as resp:
-            if resp.status_code == 200:
-                data = _safe_json(resp)
-                if data and isinstance(data, list):
-                    for b in data:
-                        bid = b.get('brandId')
-                        if bid and bid not in _brand_ids:
-                            _brand_ids.append(bid)
-                resp.success()
-            else:
-                resp.failure(f'Status {resp.status_code}')
+        self.client.get('/api/catalog/brands/', name='GET /catalog/brands')
 
     @tag('catalog')
     @task(1)
@@ -166,7 +252,7 @@ class GuestUser(HttpUser):
 
 #  2. ПОКУПАТЕЛЬ — полный цикл покупки
 
-class BuyerUser(HttpUser):
+class BuyerUser(FastHttpUser):
     """
     Авторизованный покупатель.
     Вес 3 — второй по частоте тип пользователя.
@@ -174,28 +260,33 @@ class BuyerUser(HttpUser):
     """
     weight = 3
     wait_time = between(2, 7)
+    network_timeout = 30.0
+    connection_timeout = 5.0
+    # Одно-два keep-alive соединения на пользователя, как у браузера (по умолчанию 10)
+    concurrency = 2
+    max_retries = 0
 
     token = None
     user_email = None
-    cart_item_ids = []
-    wishlist_item_ids = []
     address_id = None
 
     def on_start(self):
         """Регистрация нового покупателя при старте."""
-        self.user_email = fake.unique.email()
+        self.user_email = _unique_email()
         password = 'LoadTest123!'
+        first_name, last_name = random.choice(_NAMES)
+        # Те же учётные данные уходят в запасной вход без повторной сборки
+        creds = {'email': self.user_email, 'password': password}
         reg_data = {
-            'firstName': fake.first_name(),
-            'lastName': fake.last_name(),
-            'email': self.user_email,
-            'password': password,
+            **creds,
+            'firstName': first_name,
+            'lastName': last_name,
             'confirmPassword': password,
             'phone': f'7999{random.randint(1000000, 9999999)}',
-            'birthDate': fake.date_of_birth(minimum_age=18, maximum_age=60).isoformat(),
+            'birthDate': random.choice(_BIRTH_DATES),
         }
-        with self.client.post('/api/auth/register/', json=reg_data,
-                              name='POST /auth/register', catch_response=True) as resp:
+        with _post_json(self.client, '/api/auth/register/', reg_data,
+                        name='POST /auth/register', catch_response=True) as resp:
             if resp.status_code == 201:
                 data = _safe_json(resp)
                 if data:
@@ -204,24 +295,18 @@ class BuyerUser(HttpUser):
             else:
                 # Если регистрация не удалась — пробуем войти
                 resp.success()
-                login_data = {'email': self.user_email, 'password': password}
-                with self.client.post('/api/auth/login/', json=login_data,
-                                      name='POST /auth/login', catch_response=True) as login_resp:
+                with _post_json(self.client, '/api/auth/login/', creds,
+                                name='POST /auth/login', catch_response=True) as login_resp:
                     if login_resp.status_code == 200:
                         data = _safe_json(login_resp)
                         if data:
                             self.token = data.get('token')
                     login_resp.success()
 
+        self.auth_headers = _auth_headers(self.token)
         self.cart_item_ids = []
         self.wishlist_item_ids = []
 
-    def _headers(self):
-        """Заголовки авторизации."""
-        if self.token:
-            return {'Authorization': f'Token {self.token}'}
-        return {}
-
     @tag('catalog')
     @task(5)
     def browse_catalog(self):
@@ -229,14 +314,14 @@ class BuyerUser(HttpUser):
         self.client.get('/api/catalog/products/', name='GET /catalog/products')
         if _product_ids and random.random() > 0.5:
             pid = random.choice(_product_ids)
-            self.client.get(f'/api/catalog/products/{pid}/',
+            self.client.get(_PRODUCT_URL(pid),
                             name='GET /catalog/products/[id]')
 
     @tag('profile')
     @task(2)
     def view_profile(self):
         """Просмотр профиля."""
-        self.client.get('/api/auth/profile/', headers=self._headers(),
+        self.client.get('/api/auth/profile/', headers=self.auth_headers,
                         name='GET /auth/profile')
 
     @tag('cart')
@@ -245,23 +330,24 @@ class BuyerUser(HttpUser):
         """Добавление товара в корзину."""
         if not _product_ids:
             return
-        pid = random.choice(_product_ids)
-        data = {'productId': pid, 'quantity': random.randint(1, 3)}
-        with self.client.post('/api/auth/cart/', json=data, headers=self._headers(),
-                              name='POST /auth/cart', catch_response=True) as resp:
+        self._add_cart_item(random.choice(_product_ids), random.randint(1, 3))
+
+    def _add_cart_item(self, pid, quantity):
+        """POST /auth/cart: отказ (нет на складе и т.п.) не считаем ошибкой."""
+        data = {'productId': pid, 'quantity': quantity}
+        with _post_json(self.client, '/api/auth/cart/', data, headers=self.auth_headers,
+                        name='POST /auth/cart', catch_response=True) as resp:
             if resp.status_code in (200, 201):
                 rdata = _safe_json(resp)
                 if rdata and 'cartId' in rdata:
                     self.cart_item_ids.append(rdata['cartId'])
-                resp.success()
-            else:
-                resp.success()  # не считаем ошибкой
+            resp.success()
 
     @tag('cart')
     @task(3)
     def view_cart(self):
         """Просмотр корзины."""
-        self.client.get('/api/auth/cart/', headers=self._headers(),
+        self.client.get('/api/auth/cart/', headers=self.auth_headers,
                         name='GET /auth/cart')
 
     @tag('cart')
@@ -270,7 +356,7 @@ class BuyerUser(HttpUser):
         """Удаление из корзины."""
         if self.cart_item_ids:
             cid = self.cart_item_ids.pop()
-            self.client.delete(f'/api/auth/cart/{cid}/', headers=self._headers(),
+            self.client.delete(_CART_ITEM_URL(cid), headers=self.auth_headers,
                                name='DELETE /auth/cart/[id]')
 
     @tag('wishlist')
@@ -280,9 +366,9 @@ class BuyerUser(HttpUser):
         if not _product_ids:
             return
         pid = random.choice(_product_ids)
-        with self.client.post('/api/auth/wishlist/add/', json={'productId': pid},
-                              headers=self._headers(),
-                              name='POST /auth/wishlist/add', catch_response=True) as resp:
+        with _post_json(self.client, '/api/auth/wishlist/add/', {'productId': pid},
+                        headers=self.auth_headers,
+                        name='POST /auth/wishlist/add', catch_response=True) as resp:
             if resp.status_code in (200, 201):
                 rdata = _safe_json(resp)
                 if rdata and 'wishlistId' in rdata:
@@ -293,7 +379,7 @@ class BuyerUser(HttpUser):
     @task(2)
     def view_wishlist(self):
         """Просмотр избранного."""
-        self.client.get('/api/auth/wishlist/', headers=self._headers(),
+        self.client.get('/api/auth/wishlist/', headers=self.auth_headers,
                         name='GET /auth/wishlist')
 
     @tag('checkout')
@@ -303,54 +389,55 @@ class BuyerUser(HttpUser):
         if not _product_ids:
             return
 
-        # 1. Добавить в корзину
-        pid = random.choice(_product_ids)
-        self.client.post('/api/auth/cart/', json={'productId': pid, 'quantity': 1},
-                         headers=self._headers(), name='POST /auth/cart (checkout)')
+        # 1. Добавить в корзину — параллельно с созданием адреса: шаги
+        # независимы, а у покупателя два соединения (concurrency = 2)
+        cart_add = gevent.spawn(self._add_cart_item, random.choice(_product_ids), 1)
 
         # 2. Создать адрес
+        city, street, postcode = random.choice(_ADDRESSES)
         addr_data = {
-            'city': fake.city(),
-            'street': fake.street_name(),
+            'city': city,
+            'street': street,
             'house': str(random.randint(1, 100)),
-            'index': fake.postcode()[:6],
+            'index': postcode,
         }
-        with self.client.post('/api/auth/addresses/create/', json=addr_data,
-                              headers=self._headers(),
-                              name='POST /auth/addresses/create', catch_response=True) as resp:
+        with _post_json(self.client, '/api/auth/addresses/create/', addr_data,
+                        headers=self.auth_headers,
+                        name='POST /auth/addresses/create', catch_response=True) as resp:
             rdata = _safe_json(resp)
             if resp.status_code == 201 and rdata:
                 self.address_id = rdata.get('addressId')
             resp.success()
+        cart_add.join()
 
-        # 3. Оформить заказ
+        # 3. Оформить заказ — когда товар уже в корзине
         if self.address_id:
             order_data = {
-                'deliveryType': random.choice(['самовывоз', 'курьером']),
+                'deliveryType': random.choice(_DELIVERY_TYPES),
                 'addressId': self.address_id,
-                'paymentType': random.choice(['онлайн', 'наличными при получении']),
+                'paymentType': random.choice(_PAYMENT_TYPES),
             }
-            self.client.post('/api/auth/checkout/create/', json=order_data,
-                             headers=self._headers(),
-                             name='POST /auth/checkout/create')
+            _post_json(self.client, '/api/auth/checkout/create/', order_data,
+                       headers=self.auth_headers,
+                       name='POST /auth/checkout/create')
 
     @tag('orders')
     @task(1)
     def view_orders(self):
         """Просмотр заказов."""
-        self.client.get('/api/auth/orders/', headers=self._headers(),
+        self.client.get('/api/auth/orders/', headers=self.auth_headers,
                         name='GET /auth/orders')
 
     @tag('addresses')
     @task(1)
     def view_addresses(self):
         """Просмотр адресов."""
-        self.client.get('/api/auth/addresses/', headers=self._headers(),
+        self.client.get('/api/auth/addresses/', headers=self.auth_headers,
                         name='GET /auth/addresses')
 
 #  3. АДМИНИСТРАТОР — управление контентом
 
-class AdminUser(HttpUser):
+class AdminUser(FastHttpUser):
     """
     Администратор магазина.
     Вес 1 — самый редкий тип пользователя.
@@ -358,93 +445,92 @@ class AdminUser(HttpUser):
     """
     weight = 1
     wait_time = between(3, 10)
+    network_timeout = 30.0
+    connection_timeout = 5.0
+    # Одно-два keep-alive соединения на пользователя, как у браузера (по умолчанию 10)
+    concurrency = 2
+    max_retries = 0
 
     token = None
     admin_email = None
-    _created_category_ids = []
-    _created_brand_ids = []
-    _created_product_ids = []
 
     def on_start(self):
         """Регистрация администратора (будет покупателем, но сможет видеть публичные API)."""
         # Для нагрузочного теста создаём обычного пользователя.
         # Для полноценного теста админских эндпоинтов нужен реальный аккаунт администратора.
         # Здесь мы используем заранее созданного админа или регистрируем нового.
-        self.admin_email = fake.unique.email()
+        self.admin_email = _unique_email()
         password = 'AdminLoad123!'
+        first_name, last_name = random.choice(_NAMES)
         reg_data = {
-            'firstName': fake.first_name(),
-            'lastName': fake.last_name(),
+            'firstName': first_name,
+            'lastName': last_name,
             'email': self.admin_email,
             'password': password,
             'confirmPassword': password,
             'phone': f'7999{random.randint(1000000, 9999999)}',
             'birthDate': '1990-01-01',
         }
-        with self.client.post('/api/auth/register/', json=reg_data,
-                              name='POST /auth/register (admin)',
-                              catch_response=True) as resp:
+        with _post_json(self.client, '/api/auth/register/', reg_data,
+                        name='POST /auth/register',
+                        catch_response=True) as resp:
             data = _safe_json(resp)
             if resp.status_code == 201 and data:
                 self.token = data.get('token')
             resp.success()
 
+        self.auth_headers = _auth_headers(self.token)
         self._created_category_ids = []
         self._created_brand_ids = []
         self._created_product_ids = []
 
-    def _headers(self):
-        if self.token:
-            return {'Authorization': f'Token {self.token}'}
-        return {}
-
     @tag('admin', 'dashboard')
     @task(3)
     def view_dashboard(self):
         """Просмотр дашборда."""
-        self.client.get('/api/admin/dashboard/', headers=self._headers(),
+        self.client.get('/api/admin/dashboard/', headers=self.auth_headers,
                         name='GET /admin/dashboard')
 
     @tag('admin', 'analytics')
     @task(2)
     def view_analytics_sales(self):
         """Просмотр аналитики продаж."""
-        self.client.get('/api/admin/analytics/sales/', headers=self._headers(),
+        self.client.get('/api/admin/analytics/sales/', headers=self.auth_headers,
                         name='GET /admin/analytics/sales')
 
     @tag('admin', 'analytics')
     @task(2)
     def view_analytics_products(self):
         """Просмотр аналитики товаров."""
-        self.client.get('/api/admin/analytics/products/', headers=self._headers(),
+        self.client.get('/api/admin/analytics/products/', headers=self.auth_headers,
                         name='GET /admin/analytics/products')
 
     @tag('admin', 'analytics')
     @task(1)
     def view_user_activity(self):
         """Просмотр активности пользователей."""
-        self.client.get('/api/admin/analytics/user-activity/', headers=self._headers(),
+        self.client.get('/api/admin/analytics/user-activity/', headers=self.auth_headers,
                         name='GET /admin/analytics/user-activity')
 
     @tag('admin', 'catalog')
     @task(3)
     def admin_browse_products(self):
         """Просмотр списка товаров в админке."""
-        self.client.get('/api/admin/products/', headers=self._headers(),
+        self.client.get('/api/admin/products/', headers=self.auth_headers,
                         name='GET /admin/products')
 
     @tag('admin', 'catalog')
     @task(2)
     def admin_browse_categories(self):
         """Просмотр категорий в админке."""
-        self.client.get('/api/admin/categories/', headers=self._headers(),
+        self.client.get('/api/admin/categories/', headers=self.auth_headers,
                         name='GET /admin/categories')
 
     @tag('admin', 'catalog')
     @task(2)
     def admin_browse_brands(self):
         """Просмотр брендов в админке."""
-        self.client.get('/api/admin/brands/', headers=self._headers(),
+        self.client.get('/api/admin/brands/', headers=self.auth_headers,
                         name='GET /admin/brands')
 
     @tag('admin', 'crud')
@@ -452,37 +538,33 @@ class AdminUser(HttpUser):
     def admin_create_category(self):
         """Создание категории."""
         data = {
-            'categoryName': f'Нагр-{fake.word()}-{random.randint(1, 99999)}',
-            'categoryDescription': fake.sentence(nb_words=10),
+            'categoryName': f'Нагр-{random.choice(_WORDS)}-{random.randint(1, 99999)}',
+            'categoryDescription': random.choice(_SENTENCES),
         }
-        with self.client.post('/api/admin/categories/', json=data,
-                              headers=self._headers(),
-                              name='POST /admin/categories',
-                              catch_response=True) as resp:
-            if resp.status_code == 201:
-                rdata = _safe_json(resp)
-                if rdata and 'categoryId' in rdata:
-                    self._created_category_ids.append(rdata['categoryId'])
-            resp.success()
+        resp = _post_json(self.client, '/api/admin/categories/', data,
+                          headers=self.auth_headers,
+                          name='POST /admin/categories')
+        if resp.status_code == 201:
+            rdata = _safe_json(resp)
+            if rdata and 'categoryId' in rdata:
+                self._created_category_ids.append(rdata['categoryId'])
 
     @tag('admin', 'crud')
     @task(1)
     def admin_create_brand(self):
         """Создание бренда."""
         data = {
-            'brandName': f'Нагр-{fake.company()[:30]}-{random.randint(1, 99999)}',
-            'brandDescription': fake.sentence(nb_words=8),
-            'brandCountry': fake.country()[:50],
+            'brandName': f'Нагр-{random.choice(_COMPANIES)}-{random.randint(1, 99999)}',
+            'brandDescription': random.choice(_SENTENCES),
+            'brandCountry': random.choice(_COUNTRIES),
         }
-        with self.client.post('/api/admin/brands/', json=data,
-                              headers=self._headers(),
-                              name='POST /admin/brands',
-                              catch_response=True) as resp:
-            if resp.status_code == 201:
-                rdata = _safe_json(resp)
-                if rdata and 'brandId' in rdata:
-                    self._created_brand_ids.append(rdata['brandId'])
-            resp.success()
+        resp = _post_json(self.client, '/api/admin/brands/', data,
+                          headers=self.auth_headers,
+                          name='POST /admin/brands')
+        if resp.status_code == 201:
+            rdata = _safe_json(resp)
+            if rdata and 'brandId' in rdata:
+                self._created_brand_ids.append(rdata['brandId'])
 
     @tag('admin', 'crud')
     @task(1)
@@ -503,44 +585,42 @@ class AdminUser(HttpUser):
             return
 
         data = {
-            'productName': f'{fake.word().capitalize()} {fake.word()} {random.randint(1, 99999)}',
-            'productDescription': fake.paragraph(nb_sentences=3),
+            'productName': f'{random.choice(_WORDS).capitalize()} {random.choice(_WORDS)} {random.randint(1, 99999)}',
+            'productDescription': random.choice(_PARAGRAPHS),
             'categoryId': cat_id,
             'brandId': brand_id,
             'price': str(round(random.uniform(100, 10000), 2)),
-            'ageRating': random.choice([0, 3, 6, 12]),
+            'ageRating': random.choice(_AGE_RATINGS),
             'quantity': random.randint(1, 200),
             'weightKg': str(round(random.uniform(0.1, 5.0), 2)),
             'dimensions': f'{random.randint(5, 50)}x{random.randint(5, 50)}x{random.randint(5, 50)}',
         }
-        with self.client.post('/api/admin/products/create/', json=data,
-                              headers=self._headers(),
-                              name='POST /admin/products/create',
-                              catch_response=True) as resp:
-            if resp.status_code == 201:
-                rdata = _safe_json(resp)
-                if rdata and 'productId' in rdata:
-                    self._created_product_ids.append(rdata['productId'])
-                    _product_ids.append(rdata['productId'])
-            resp.success()
+        resp = _post_json(self.client, '/api/admin/products/create/', data,
+                          headers=self.auth_headers,
+                          name='POST /admin/products/create')
+        if resp.status_code == 201:
+            rdata = _safe_json(resp)
+            if rdata and 'productId' in rdata:
+                self._created_product_ids.append(rdata['productId'])
+                _product_ids.append(rdata['productId'])
 
     @tag('admin', 'orders')
     @task(2)
     def admin_view_orders(self):
         """Просмотр заказов."""
-        self.client.get('/api/admin/orders/', headers=self._headers(),
+        self.client.get('/api/admin/orders/', headers=self.auth_headers,
                         name='GET /admin/orders')
 
     @tag('admin', 'users')
     @task(1)
     def admin_view_users(self):
         """Просмотр списка пользователей."""
-        self.client.get('/api/admin/users/', headers=self._headers(),
+        self.client.get('/api/admin/users/', headers=self.auth_headers,
                         name='GET /admin/users')
 
     @tag('admin', 'audit')
     @task(1)
     def admin_view_audit_logs(self):
         """Просмотр аудит-логов."""
-        self.client.get('/api/admin/audit-logs/', headers=self._headers(),
+        self.client.get('/api/admin/audit-logs/', headers=self.auth_headers,
                         name='GET /admin/audit-logs')